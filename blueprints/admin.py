@@ -3,9 +3,8 @@ Admin Blueprint - Complete User Management and Settings
 Superuser, Manager, and Admin access levels
 Session-based authentication
 """
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, abort
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, abort, g, Response, stream_with_context, make_response
 from functools import wraps
-from datetime import datetime
 from services.user_service import (
     get_all_users,
     get_pending_users,
@@ -23,375 +22,481 @@ from services.user_service import (
     get_password_reset_requests,  # ← ADD THIS
     get_pending_password_resets,   # ← ADD THIS
     approve_password_reset,         # ← ADD THIS
-    reject_password_reset          # ← ADD THIS
+    reject_password_reset,         # ← ADD THIS
+    get_superuser_dashboard_bundle,
+    get_users_by_role,
+    approve_pending_users_bulk,
+    reject_pending_users_bulk,
+    approve_password_resets_bulk,
+    approve_audit_reviewers_bulk,
+    iter_all_users,
+    get_store_version
 )
 
+# orjson serializes several times faster than stdlib json; fall back quietly
+try:
+    from orjson import dumps as _json_dumps
+except ImportError:
+    import json as _stdlib_json
+    def _json_dumps(obj):
+        return _stdlib_json.dumps(obj).encode('utf-8')
+
+from utils.cache import cache, invalidate_view_cache
+from utils.urls import cached_url_for
+
 # ← ADD THESE MISSING FUNCTIONS TO services/user_service.py or import from correct location
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
+# Flash categories - bound once instead of re-created string literals per call
+_OK = 'success'
+_ERR = 'danger'
+_WARN = 'warning'
+
+@admin_bp.before_request
+def _load_current_user():
+    """Resolve the session user once per request instead of in every handler"""
+    g.current_user = session.get('user') or {}
+
+def _admin_cache_key():
+    """Cache key scoped to path, current user and query filters"""
+    user = g.current_user
+    return (f"{request.path}:{user.get('username', '')}:"
+            f"{request.args.get('action', '')}:{request.args.get('role', 'All')}")
+
+def _has_pending_flashes():
+    """Skip caching responses that carry one-time flash messages"""
+    return bool(session.get('_flashes'))
+
+def _role_buckets():
+    """Role -> users index, built once per request and reused via flask.g"""
+    if 'role_buckets' not in g:
+        g.role_buckets = get_users_by_role()
+    return g.role_buckets
+
+def _panel_etag(*parts):
+    """ETag for an admin panel: store version plus the view's variable parts"""
+    return ':'.join([get_store_version(), g.current_user.get('username', '')]
+                    + [str(p) for p in parts])
+
+def _not_modified(etag):
+    """True when the client already holds the current version of this view"""
+    return not _has_pending_flashes() and request.if_none_match.contains(etag)
+
+def _cacheable_response(response):
+    """Only cache full 200 renders
+
+    Defensive guard for the view cache: anything that is not a full
+    page (304s, redirects) must never be stored and replayed to
+    unconditional requests.
+    """
+    return getattr(response, 'status_code', 200) == 200
+
+def _conditional(parts):
+    """Answer If-None-Match before consulting the view cache
+
+    Stacks outside @cache.cached so revalidations short-circuit to an
+    empty 304 whether the cache is warm or cold - inside the cached
+    function the check only ever ran on a miss. `parts` maps the
+    request to the variable parts of the panel's ETag; the computed
+    tag is stashed on g for the renderer to set on its response.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            g.panel_etag = _panel_etag(*parts())
+            if _not_modified(g.panel_etag):
+                return Response(status=304)
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def _json_stream(records):
+    """Stream an iterable of dicts as a JSON array, one record at a time"""
+    yield b'['
+    first = True
+    for record in records:
+        if not first:
+            yield b','
+        yield _json_dumps(record)
+        first = False
+    yield b']'
+
 # ============================================================================
 # AUTHENTICATION DECORATORS
 # ============================================================================
 
-def login_required(f):
-    """Decorator to require login"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user' not in session:
-            flash('Please log in to access this page.', 'warning')
-            return redirect(url_for('auth.login'))
-        return f(*args, **kwargs)
-    return decorated_function
-
-def superuser_required(f):
-    """Decorator to require superuser access"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user' not in session:
-            flash('Please log in to access this page.', 'warning')
-            return redirect(url_for('auth.login'))
-        
-        user = session.get('user', {})
-        if user.get('role') != 'superuser':
-            flash('Superuser access required', 'danger')
-            abort(403)
-        
-        return f(*args, **kwargs)
-    return decorated_function
-
-def admin_required(f):
-    """Decorator to require admin or superuser access"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user' not in session:
-            flash('Please log in to access this page.', 'warning')
-            return redirect(url_for('auth.login'))
-        
-        user = session.get('user', {})
-        if user.get('role') not in ['superuser', 'admin']:
-            flash('Admin access required', 'danger')
-            abort(403)
-        
-        return f(*args, **kwargs)
-    return decorated_function
-
-def manager_required(f):
-    """Decorator to require manager or superuser access"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user' not in session:
-            flash('Please log in to access this page.', 'warning')
-            return redirect(url_for('auth.login'))
-        
-        user = session.get('user', {})
-        if user.get('role') not in ['superuser', 'manager']:
-            flash('Manager access required', 'danger')
-            abort(403)
-        
-        return f(*args, **kwargs)
-    return decorated_function
+def require(*roles, message='You do not have permission to access this page.'):
+    """Decorator factory: require login plus one of the given roles
+
+    Single wrapper frame replaces the old stacked
+    @login_required @<role>_required pairs; the role allowlist is a
+    frozenset built once at decoration time.
+    """
+    roles = frozenset(roles)
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            user = g.current_user
+            if not user:
+                flash('Please log in to access this page.', _WARN)
+                return redirect(cached_url_for('auth.login'))
+
+            if user.get('role') not in roles:
+                flash(message, _ERR)
+                abort(403)
+
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
 
 # ============================================================================
 # SUPERUSER PANEL
 # ============================================================================
 
 @admin_bp.route('/superuser')
-@login_required
-@superuser_required
+@require('superuser', message='Superuser access required')
+@_conditional(lambda: (request.args.get('action', 'pending_approvals'),))
+@cache.cached(timeout=30, make_cache_key=_admin_cache_key, unless=_has_pending_flashes,
+              response_filter=_cacheable_response)
 def superuser():
     """Superuser control panel"""
-    user = session.get('user', {})
-    
-    # Get counts for menu badges
-    pending_users = get_pending_users()
-    pending_resets = get_pending_password_resets()
-    pending_reviewers = get_pending_audit_reviewers()
-    
+    user = g.current_user
+
     # Get action from query parameter
     action = request.args.get('action', 'pending_approvals')
-    
-    # Get statistics
-    stats = get_user_statistics()
-    all_users = get_all_users()
-    audit_reviewers = get_audit_reviewers()
-    
-    # Get password reset history
-    all_resets = get_password_reset_requests()
-    processed_resets = [r for r in all_resets if r.get('status') != 'pending']
-    
-    return render_template('admin/superuser.html',
+
+    # Load all panel data in one pass instead of seven separate service calls
+    bundle = get_superuser_dashboard_bundle()
+    pending_users = bundle['pending_users']
+    pending_resets = bundle['pending_resets']
+    pending_reviewers = bundle['pending_reviewers']
+
+    resp = make_response(render_template('admin/superuser.html',
                          user=user,
                          action=action,
                          pending_users=pending_users,
                          pending_resets=pending_resets,
                          pending_reviewers=pending_reviewers,
-                         audit_reviewers=audit_reviewers,
-                         all_users=all_users,
-                         processed_resets=processed_resets[-10:],  # Last 10
-                         stats=stats,
+                         audit_reviewers=bundle['audit_reviewers'],
+                         all_users=bundle['all_users'],
+                         processed_resets=bundle['processed_resets'],  # Last 10
+                         stats=bundle['stats'],
                          pending_count={
                              'users': len(pending_users),
                              'resets': len(pending_resets),
                              'reviewers': len(pending_reviewers)
-                         })
+                         }))
+    resp.set_etag(g.panel_etag)
+    return resp
+
+# ============================================================================
+# SINGLE-ITEM APPROVAL ACTIONS (generated from a table)
+# ============================================================================
+# The approve/reject/revoke handlers were seven copy-paste variants differing
+# only in service call, redirect action and flash category. Generating them
+# from one table keeps them uniform and in one place.
+
+_ACTION_ROUTES = [
+    # (rule, endpoint, service adapter, redirect action, success category)
+    ('approve-user/<username>', 'approve_user',
+     lambda username, actor: approve_pending_user(
+         username, request.form.get('approved_role', 'user'), actor),
+     'pending_approvals', _OK),
+    ('reject-user/<username>', 'reject_user',
+     lambda username, actor: reject_pending_user(username),
+     'pending_approvals', _WARN),
+    ('approve-reset/<request_id>', 'approve_reset',
+     lambda request_id, actor: approve_password_reset(request_id, actor),
+     'password_resets', _OK),
+    ('reject-reset/<request_id>', 'reject_reset',
+     lambda request_id, actor: reject_password_reset(request_id, actor),
+     'password_resets', _WARN),
+    ('approve-reviewer/<username>', 'approve_reviewer',
+     lambda username, actor: approve_audit_reviewer(username, actor),
+     'audit_reviewers', _OK),
+    ('reject-reviewer/<username>', 'reject_reviewer',
+     lambda username, actor: reject_audit_reviewer(username),
+     'audit_reviewers', _WARN),
+    ('revoke-reviewer/<username>', 'revoke_reviewer',
+     lambda username, actor: revoke_audit_reviewer(username, actor),
+     'audit_reviewers', _OK),
+]
+
+def _register_action_routes():
+    """Register the table-driven POST handlers on the blueprint"""
+    for rule, endpoint, svc, redirect_action, ok_category in _ACTION_ROUTES:
+        def handler(_svc=svc, _action=redirect_action, _ok=ok_category, **kwargs):
+            (value,) = kwargs.values()
+            success, message = _svc(value, g.current_user.get('username', 'admin'))
+
+            if success:
+                invalidate_view_cache()
+                flash(message, _ok)
+            else:
+                flash(message, _ERR)
+
+            return redirect(cached_url_for('admin.superuser', action=_action))
+
+        handler.__name__ = endpoint
+        admin_bp.add_url_rule(
+            f'/{rule}',
+            endpoint=endpoint,
+            view_func=require('superuser', message='Superuser access required')(handler),
+            methods=['POST'])
+
+_register_action_routes()
 
 # ============================================================================
 # PENDING USER APPROVALS
 # ============================================================================
 
-@admin_bp.route('/approve-user/<username>', methods=['POST'])
-@login_required
-@superuser_required
-def approve_user(username):
-    """Approve pending user"""
+@admin_bp.route('/batch-approve-users', methods=['POST'])
+@require('superuser', message='Superuser access required')
+def batch_approve_users():
+    """Approve several pending users in one store write"""
+    usernames = request.form.getlist('usernames')
+    if not usernames:
+        flash('No users selected', _WARN)
+        return redirect(cached_url_for('admin.superuser', action='pending_approvals'))
+
     approved_role = request.form.get('approved_role', 'user')
-    approved_by = session.get('user', {}).get('username', 'admin')
-    
-    success, message = approve_pending_user(username, approved_role, approved_by)
-    
+    approved_by = g.current_user.get('username', 'admin')
+
+    success, message = approve_pending_users_bulk(usernames, approved_role, approved_by)
+
     if success:
-        flash(message, 'success')
+        invalidate_view_cache()
+        flash(message, _OK)
     else:
-        flash(message, 'danger')
-    
-    return redirect(url_for('admin.superuser', action='pending_approvals'))
-
-@admin_bp.route('/reject-user/<username>', methods=['POST'])
-@login_required
-@superuser_required
-def reject_user(username):
-    """Reject pending user"""
-    success, message = reject_pending_user(username)
-    
+        flash(message, _ERR)
+
+    return redirect(cached_url_for('admin.superuser', action='pending_approvals'))
+
+@admin_bp.route('/batch-reject-users', methods=['POST'])
+@require('superuser', message='Superuser access required')
+def batch_reject_users():
+    """Reject several pending users in one store write"""
+    usernames = request.form.getlist('usernames')
+    if not usernames:
+        flash('No users selected', _WARN)
+        return redirect(cached_url_for('admin.superuser', action='pending_approvals'))
+
+    success, message = reject_pending_users_bulk(usernames)
+
     if success:
-        flash(message, 'warning')
+        invalidate_view_cache()
+        flash(message, _WARN)
     else:
-        flash(message, 'danger')
-    
-    return redirect(url_for('admin.superuser', action='pending_approvals'))
+        flash(message, _ERR)
+
+    return redirect(cached_url_for('admin.superuser', action='pending_approvals'))
 
 # ============================================================================
 # PASSWORD RESET APPROVALS
 # ============================================================================
 
-@admin_bp.route('/approve-reset/<request_id>', methods=['POST'])
-@login_required
-@superuser_required
-def approve_reset(request_id):
-    """Approve password reset"""
-    approved_by = session.get('user', {}).get('username', 'admin')
-    
-    success, message = approve_password_reset(request_id, approved_by)
-    
-    if success:
-        flash(message, 'success')
-    else:
-        flash(message, 'danger')
-    
-    return redirect(url_for('admin.superuser', action='password_resets'))
-
-@admin_bp.route('/reject-reset/<request_id>', methods=['POST'])
-@login_required
-@superuser_required
-def reject_reset(request_id):
-    """Reject password reset"""
-    rejected_by = session.get('user', {}).get('username', 'admin')
-    
-    success, message = reject_password_reset(request_id, rejected_by)
-    
+@admin_bp.route('/batch-approve-resets', methods=['POST'])
+@require('superuser', message='Superuser access required')
+def batch_approve_resets():
+    """Approve several password resets in one store write"""
+    request_ids = request.form.getlist('request_ids')
+    if not request_ids:
+        flash('No requests selected', _WARN)
+        return redirect(cached_url_for('admin.superuser', action='password_resets'))
+
+    approved_by = g.current_user.get('username', 'admin')
+
+    success, message = approve_password_resets_bulk(request_ids, approved_by)
+
     if success:
-        flash(message, 'warning')
+        invalidate_view_cache()
+        flash(message, _OK)
     else:
-        flash(message, 'danger')
-    
-    return redirect(url_for('admin.superuser', action='password_resets'))
+        flash(message, _ERR)
+
+    return redirect(cached_url_for('admin.superuser', action='password_resets'))
 
 # ============================================================================
 # AUDIT REVIEWER APPROVALS
 # ============================================================================
 
-@admin_bp.route('/approve-reviewer/<username>', methods=['POST'])
-@login_required
-@superuser_required
-def approve_reviewer(username):
-    """Approve audit reviewer access"""
-    approved_by = session.get('user', {}).get('username', 'admin')
-    
-    success, message = approve_audit_reviewer(username, approved_by)
-    
-    if success:
-        flash(message, 'success')
-    else:
-        flash(message, 'danger')
-    
-    return redirect(url_for('admin.superuser', action='audit_reviewers'))
-
-@admin_bp.route('/reject-reviewer/<username>', methods=['POST'])
-@login_required
-@superuser_required
-def reject_reviewer(username):
-    """Reject audit reviewer request"""
-    success, message = reject_audit_reviewer(username)
-    
-    if success:
-        flash(message, 'warning')
-    else:
-        flash(message, 'danger')
-    
-    return redirect(url_for('admin.superuser', action='audit_reviewers'))
-
-@admin_bp.route('/revoke-reviewer/<username>', methods=['POST'])
-@login_required
-@superuser_required
-def revoke_reviewer(username):
-    """Revoke audit reviewer access"""
-    revoked_by = session.get('user', {}).get('username', 'admin')
-    
-    success, message = revoke_audit_reviewer(username, revoked_by)
-    
+@admin_bp.route('/batch-approve-reviewers', methods=['POST'])
+@require('superuser', message='Superuser access required')
+def batch_approve_reviewers():
+    """Approve several audit reviewer requests in one store write"""
+    usernames = request.form.getlist('usernames')
+    if not usernames:
+        flash('No users selected', _WARN)
+        return redirect(cached_url_for('admin.superuser', action='audit_reviewers'))
+
+    approved_by = g.current_user.get('username', 'admin')
+
+    success, message = approve_audit_reviewers_bulk(usernames, approved_by)
+
     if success:
-        flash(message, 'success')
+        invalidate_view_cache()
+        flash(message, _OK)
     else:
-        flash(message, 'danger')
-    
-    return redirect(url_for('admin.superuser', action='audit_reviewers'))
+        flash(message, _ERR)
+
+    return redirect(cached_url_for('admin.superuser', action='audit_reviewers'))
 
 # ============================================================================
 # CREATE USER DIRECTLY
 # ============================================================================
 
 @admin_bp.route('/create-user', methods=['POST'])
-@login_required
-@superuser_required
+@require('superuser', message='Superuser access required')
 def create_user_direct():
     """Create user directly (superuser only)"""
     username = request.form.get('username', '').strip()
     email = request.form.get('email', '').strip()
     password = request.form.get('password', '').strip()
     role = request.form.get('role', 'user')
-    created_by = session.get('user', {}).get('username', 'admin')
+    created_by = g.current_user.get('username', 'admin')
     
     if not username or not email or not password:
-        flash('All fields are required', 'danger')
-        return redirect(url_for('admin.superuser', action='add_user'))
+        flash('All fields are required', _ERR)
+        return redirect(cached_url_for('admin.superuser', action='add_user'))
     
     success, message = create_user(username, email, password, role, created_by)
     
     if success:
-        flash(message, 'success')
+        invalidate_view_cache()
+        flash(message, _OK)
     else:
-        flash(message, 'danger')
+        flash(message, _ERR)
     
-    return redirect(url_for('admin.superuser', action='add_user'))
+    return redirect(cached_url_for('admin.superuser', action='add_user'))
 
 # ============================================================================
 # MANAGE USERS
 # ============================================================================
 
 @admin_bp.route('/update-role/<username>', methods=['POST'])
-@login_required
-@superuser_required
+@require('superuser', message='Superuser access required')
 def update_role(username):
     """Update user role"""
     new_role = request.form.get('new_role', 'user')
-    updated_by = session.get('user', {}).get('username', 'admin')
+    updated_by = g.current_user.get('username', 'admin')
     
     success, message = update_user_role(username, new_role, updated_by)
     
     if success:
-        flash(message, 'success')
+        invalidate_view_cache()
+        flash(message, _OK)
     else:
-        flash(message, 'danger')
+        flash(message, _ERR)
     
-    return redirect(url_for('admin.superuser', action='manage_users'))
+    return redirect(cached_url_for('admin.superuser', action='manage_users'))
 
 @admin_bp.route('/delete-user/<username>', methods=['POST'])
-@login_required
-@superuser_required
+@require('superuser', message='Superuser access required')
 def delete_user_route(username):
     """Delete user"""
-    current_username = session.get('user', {}).get('username', '')
+    current_username = g.current_user.get('username', '')
     
     if username == current_username:
-        flash('You cannot delete your own account', 'danger')
-        return redirect(url_for('admin.superuser', action='delete_user'))
+        flash('You cannot delete your own account', _ERR)
+        return redirect(cached_url_for('admin.superuser', action='delete_user'))
     
     success, message = delete_user(username)
     
     if success:
-        flash(message, 'success')
+        invalidate_view_cache()
+        flash(message, _OK)
     else:
-        flash(message, 'danger')
+        flash(message, _ERR)
     
-    return redirect(url_for('admin.superuser', action='delete_user'))
+    return redirect(cached_url_for('admin.superuser', action='delete_user'))
 
 # ============================================================================
 # MANAGER PANEL
 # ============================================================================
 
 @admin_bp.route('/manager')
-@login_required
-@manager_required
+@require('superuser', 'manager', message='Manager access required')
+@_conditional(lambda: ())
+@cache.cached(timeout=30, make_cache_key=_admin_cache_key, unless=_has_pending_flashes,
+              response_filter=_cacheable_response)
 def manager():
     """Manager control panel"""
-    user = session.get('user', {})
-    
+    user = g.current_user
+
     # Get team statistics
     stats = get_user_statistics()
-    all_users = get_all_users()
-    team_members = {u: d for u, d in all_users.items() if d.get('role') == 'user'}
-    
-    return render_template('admin/manager.html',
+    team_members = _role_buckets().get('user', {})
+
+    resp = make_response(render_template('admin/manager.html',
                          user=user,
                          stats=stats,
-                         team_members=team_members)
+                         team_members=team_members))
+    resp.set_etag(g.panel_etag)
+    return resp
 
 # ============================================================================
 # ADMIN USER PANEL
 # ============================================================================
 
 @admin_bp.route('/admin-user')
-@login_required
-@admin_required
+@require('superuser', 'admin', message='Admin access required')
+@_conditional(lambda: (request.args.get('role', 'All'),))
+@cache.cached(timeout=30, make_cache_key=_admin_cache_key, unless=_has_pending_flashes,
+              response_filter=_cacheable_response)
 def admin_user():
     """Admin user management panel"""
-    user = session.get('user', {})
-    
-    # Get all users
-    all_users = get_all_users()
-    stats = get_user_statistics()
-    
+    user = g.current_user
+
     # Get filter
     role_filter = request.args.get('role', 'All')
-    
-    # Apply filter
+
+    stats = get_user_statistics()
+
+    # Apply filter via the per-request role index
     if role_filter != 'All':
-        filtered_users = {u: d for u, d in all_users.items() if d.get('role') == role_filter}
+        filtered_users = _role_buckets().get(role_filter, {})
     else:
-        filtered_users = all_users
-    
-    return render_template('admin/admin_user.html',
+        filtered_users = get_all_users()
+
+    resp = make_response(render_template('admin/admin_user.html',
                          user=user,
                          all_users=filtered_users,
                          stats=stats,
-                         role_filter=role_filter)
+                         role_filter=role_filter))
+    resp.set_etag(g.panel_etag)
+    return resp
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+
+@admin_bp.route('/api/users')
+@require('superuser', 'admin', message='Admin access required')
+def api_users():
+    """User list as JSON, streamed record-by-record
+
+    Avoids buffering the whole serialized list in memory the way
+    jsonify(get_all_users()) would as the user count grows.
+    """
+    return Response(stream_with_context(_json_stream(iter_all_users())),
+                    mimetype='application/json')
 
 # ============================================================================
 # EMAIL SETTINGS
 # ============================================================================
 
 @admin_bp.route('/email-settings', methods=['GET', 'POST'])
-@login_required
-@admin_required
+@require('superuser', 'admin', message='Admin access required')
 def email_settings():
     """Email configuration settings"""
-    user = session.get('user', {})
+    user = g.current_user
     
     if request.method == 'POST':
         # TODO: Implement email settings save
         flash('Email settings updated successfully (Feature under construction)', 'info')
-        return redirect(url_for('admin.email_settings'))
+        return redirect(cached_url_for('admin.email_settings'))
     
     email_config = {
         'smtp_server': '',
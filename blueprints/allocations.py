@@ -2,13 +2,17 @@
 Allocations Blueprint - Complete with Manager Dashboard
 Session-based authentication with Advanced Filtering
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, session, send_file
+from flask import Blueprint, render_template, redirect, url_for, flash, request, session, send_file, g, make_response
 from functools import wraps
-from datetime import datetime
-import io
-import json
+from datetime import datetime, date
+import hashlib
 from services.allocation_service import (
     create_allocation_record,
+    query_allocations,
+    summarize_allocations,
+    get_allocations_version,
+    get_engineer_efficiency,
+    get_chart_datasets,
     get_all_allocations,
     get_allocation_by_id,
     update_allocation_record,
@@ -19,9 +23,28 @@ from services.allocation_service import (
     calculate_engineer_efficiency
 )
 from config import SYSTEMS, THERAPEUTIC_AREAS, ROLES_ALLOCATION
+from utils.jsonio import ojsonify
 
 allocations_bp = Blueprint('allocations', __name__, url_prefix='/allocations')
 
+# Role allowlists - built once at import, O(1) membership tests
+_ADMIN_ROLES = frozenset({'superuser', 'admin'})
+_PRIVILEGED_ROLES = frozenset({'superuser', 'admin', 'manager'})
+
+@allocations_bp.context_processor
+def _inject_form_options():
+    """Expose the form dropdown constants to this blueprint's templates
+
+    Saves create/edit (and their validation error re-renders) from
+    passing the same three constants on every render_template call.
+    Blueprint-scoped so other blueprints' template names stay untouched.
+    """
+    return {
+        'systems': SYSTEMS,
+        'therapeutic_areas': THERAPEUTIC_AREAS,
+        'roles': ROLES_ALLOCATION
+    }
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -29,23 +52,70 @@ def safe_session_set(key: str, value, default: str = '') -> None:
     """Safely set session value with type checking"""
     session[key] = str(value) if value is not None else default
 
-def get_unique_sorted(items):
-    """Get unique non-None sorted values"""
-    return sorted([item for item in set(items) if item is not None])
+_FILTER_KEYS = ('system', 'trial_category', 'therapeutic_area', 'test_engineer',
+                'role', 'trial_id', 'created_by', 'start_date', 'end_date')
 
-def get_allocations_by_user(username):
-    """Get allocations created by specific user"""
-    all_allocations = get_all_allocations()
-    return [a for a in all_allocations if a.get('created_by') == username]
+def _parse_iso_date(value):
+    """Parse an ISO YYYY-MM-DD string, returning None when invalid
+
+    date.fromisoformat is C-implemented and much faster than strptime
+    walking a format string, and the None return keeps error paths free
+    of exception handling.
+    """
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+def _build_allocation_filters(args):
+    """Parse the dashboard filter query parameters into a filter dict"""
+    return {key: args.get(key, '') for key in _FILTER_KEYS}
+
+def _paginate(items, default_per_page=50):
+    """Slice a list according to ?page= / ?per_page= query args
+
+    Returns the page of items plus a pagination dict for the template,
+    so big lists are not rendered into one huge HTML table.
+    """
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', default_per_page, type=int)
+    per_page = min(max(per_page, 1), 200)
+    total = len(items)
+    pages = max((total + per_page - 1) // per_page, 1)
+    page = min(max(page, 1), pages)
+    start = (page - 1) * per_page
+    pagination = {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': pages,
+        'has_prev': page > 1,
+        'has_next': page < pages
+    }
+    return items[start:start + per_page], pagination
+
+def _api_etag() -> str:
+    """ETag for the JSON APIs: store version plus the request variant"""
+    token = f"{get_allocations_version()}:{request.full_path}"
+    return hashlib.md5(token.encode()).hexdigest()
+
+def _not_modified(etag: str) -> bool:
+    """True when the client already holds the current representation"""
+    return request.if_none_match.contains(etag)
 
 # ============================================================================
 # AUTHENTICATION DECORATORS
 # ============================================================================
+@allocations_bp.before_request
+def _load_current_user():
+    """Deserialize the session cookie once per request"""
+    g.current_user = session.get('user') or {}
+
 def login_required(f):
     """Decorator to require login"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user' not in session:
+        if not g.current_user:
             flash('Please log in to access this page.', 'warning')
             return redirect(url_for('auth.login'))
         return f(*args, **kwargs)
@@ -53,18 +123,19 @@ def login_required(f):
 
 def role_required(*roles):
     """Decorator to require specific roles"""
+    roles = frozenset(roles)
+
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if 'user' not in session:
+            if not g.current_user:
                 flash('Please log in to access this page.', 'warning')
                 return redirect(url_for('auth.login'))
-            
-            user = session.get('user', {})
-            if user.get('role') not in roles:
+
+            if g.current_user.get('role') not in roles:
                 flash('You do not have permission to access this page.', 'danger')
                 return redirect(url_for('home.index'))
-            
+
             return f(*args, **kwargs)
         return decorated_function
     return decorator
@@ -77,15 +148,12 @@ def role_required(*roles):
 @login_required
 def index():
     """Allocations landing page with overview and quick actions"""
-    user = session.get('user', {})
+    user = g.current_user
     role = user.get('role', '')
     username = user.get('username', '')
     
     # Get allocations based on role
-    if role == 'user':
-        all_allocations = get_allocations_by_user(username)
-    else:
-        all_allocations = get_all_allocations()
+    all_allocations = get_allocations_by_role(role, username)
     
     # Calculate statistics
     stats = {
@@ -111,23 +179,26 @@ def index():
 @login_required
 def list_view():
     """List allocations - User sees own, Manager sees all"""
-    user = session.get('user', {})
+    user = g.current_user
     role = user.get('role', '')
     username = user.get('username', '')
     
     # Get allocations based on role
     allocations = get_allocations_by_role(role, username)
     
-    # Calculate stats for metrics
+    # Calculate stats for metrics (over the full list, not just one page)
     stats = {
         'total': len(allocations),
         'build': sum(1 for a in allocations if a.get('trial_category_type') == 'Build'),
-        'change_request': sum(1 for a in allocations if 'Change Request' in a.get('trial_category', '')),
+        'change_request': sum(1 for a in allocations if a.get('trial_category_type') == 'Change Request'),
         'systems': len(set(a.get('system') for a in allocations if a.get('system')))
     }
-    
+
+    page_items, pagination = _paginate(allocations)
+
     return render_template('allocations/list.html', 
-                         allocations=allocations,
+                         allocations=page_items,
+                         pagination=pagination,
                          stats=stats,
                          user=user)
 
@@ -135,7 +206,7 @@ def list_view():
 @login_required
 def create():
     """Create new allocation"""
-    user = session.get('user', {})
+    user = g.current_user
     
     if request.method == 'POST':
         # Get form data
@@ -147,30 +218,20 @@ def create():
             if not data.get(field):
                 flash(f'{field.replace("_", " ").title()} is required', 'danger')
                 return render_template('allocations/create.html',
-                                     systems=SYSTEMS,
-                                     therapeutic_areas=THERAPEUTIC_AREAS,
-                                     roles=ROLES_ALLOCATION,
                                      form_data=data,
                                      user=user)
         
         # Date validation
-        try:
-            start_date = datetime.strptime(data['start_date'], '%Y-%m-%d')
-            end_date = datetime.strptime(data['end_date'], '%Y-%m-%d')
-            if end_date < start_date:
-                flash('End date must be after start date', 'danger')
-                return render_template('allocations/create.html',
-                                     systems=SYSTEMS,
-                                     therapeutic_areas=THERAPEUTIC_AREAS,
-                                     roles=ROLES_ALLOCATION,
-                                     form_data=data,
-                                     user=user)
-        except ValueError:
+        start_date = _parse_iso_date(data['start_date'])
+        end_date = _parse_iso_date(data['end_date'])
+        if start_date is None or end_date is None:
             flash('Invalid date format', 'danger')
             return render_template('allocations/create.html',
-                                 systems=SYSTEMS,
-                                 therapeutic_areas=THERAPEUTIC_AREAS,
-                                 roles=ROLES_ALLOCATION,
+                                 form_data=data,
+                                 user=user)
+        if end_date < start_date:
+            flash('End date must be after start date', 'danger')
+            return render_template('allocations/create.html',
                                  form_data=data,
                                  user=user)
         
@@ -181,9 +242,6 @@ def create():
             if not category_detail:
                 flash('Please enter Change Request details', 'danger')
                 return render_template('allocations/create.html',
-                                     systems=SYSTEMS,
-                                     therapeutic_areas=THERAPEUTIC_AREAS,
-                                     roles=ROLES_ALLOCATION,
                                      form_data=data,
                                      user=user)
             data['trial_category'] = f"Change Request - {category_detail}"
@@ -199,9 +257,6 @@ def create():
             if not area_detail:
                 flash('Please specify therapeutic area for Others', 'danger')
                 return render_template('allocations/create.html',
-                                     systems=SYSTEMS,
-                                     therapeutic_areas=THERAPEUTIC_AREAS,
-                                     roles=ROLES_ALLOCATION,
                                      form_data=data,
                                      user=user)
             data['therapeutic_area'] = f"Others - {area_detail}"
@@ -221,16 +276,13 @@ def create():
             flash(message, 'danger')
     
     return render_template('allocations/create.html',
-                         systems=SYSTEMS,
-                         therapeutic_areas=THERAPEUTIC_AREAS,
-                         roles=ROLES_ALLOCATION,
                          user=user)
 
 @allocations_bp.route('/view/<allocation_id>')
 @login_required
 def view(allocation_id):
     """View single allocation"""
-    user = session.get('user', {})
+    user = g.current_user
     allocation = get_allocation_by_id(allocation_id)
     
     if not allocation:
@@ -238,7 +290,7 @@ def view(allocation_id):
         return redirect(url_for('allocations.list_view'))
     
     # Check permissions - User can only view their own
-    if user.get('role') not in ['superuser', 'admin', 'manager']:
+    if user.get('role') not in _PRIVILEGED_ROLES:
         if allocation.get('created_by') != user.get('username'):
             flash('You do not have permission to view this allocation', 'danger')
             return redirect(url_for('allocations.list_view'))
@@ -251,7 +303,7 @@ def view(allocation_id):
 @login_required
 def edit(allocation_id):
     """Edit allocation - Only creator or admin/superuser"""
-    user = session.get('user', {})
+    user = g.current_user
     allocation = get_allocation_by_id(allocation_id)
     
     if not allocation:
@@ -267,7 +319,7 @@ def edit(allocation_id):
         flash('Managers cannot edit allocations', 'warning')
         return redirect(url_for('allocations.list_view'))
     
-    if role not in ['superuser', 'admin']:
+    if role not in _ADMIN_ROLES:
         if creator != current_username:
             flash('You can only edit your own allocations', 'danger')
             return redirect(url_for('allocations.list_view'))
@@ -283,9 +335,6 @@ def edit(allocation_id):
                 flash('Please enter Change Request details', 'danger')
                 return render_template('allocations/edit.html',
                                      allocation=allocation,
-                                     systems=SYSTEMS,
-                                     therapeutic_areas=THERAPEUTIC_AREAS,
-                                     roles=ROLES_ALLOCATION,
                                      user=user)
             data['trial_category'] = f"Change Request - {category_detail}"
             data['trial_category_type'] = 'Change Request'
@@ -301,9 +350,6 @@ def edit(allocation_id):
                 flash('Please specify therapeutic area for Others', 'danger')
                 return render_template('allocations/edit.html',
                                      allocation=allocation,
-                                     systems=SYSTEMS,
-                                     therapeutic_areas=THERAPEUTIC_AREAS,
-                                     roles=ROLES_ALLOCATION,
                                      user=user)
             data['therapeutic_area'] = f"Others - {area_detail}"
             data['therapeutic_area_type'] = 'Others'
@@ -322,16 +368,13 @@ def edit(allocation_id):
     
     return render_template('allocations/edit.html',
                          allocation=allocation,
-                         systems=SYSTEMS,
-                         therapeutic_areas=THERAPEUTIC_AREAS,
-                         roles=ROLES_ALLOCATION,
                          user=user)
 
 @allocations_bp.route('/delete/<allocation_id>', methods=['POST'])
 @login_required
 def delete(allocation_id):
     """Delete allocation - Only creator or admin/superuser"""
-    user = session.get('user', {})
+    user = g.current_user
     allocation = get_allocation_by_id(allocation_id)
     
     if not allocation:
@@ -347,7 +390,7 @@ def delete(allocation_id):
         flash('Managers cannot delete allocations', 'warning')
         return redirect(url_for('allocations.list_view'))
     
-    if role not in ['superuser', 'admin']:
+    if role not in _ADMIN_ROLES:
         if creator != current_username:
             flash('You can only delete your own allocations', 'danger')
             return redirect(url_for('allocations.list_view'))
@@ -366,113 +409,42 @@ def delete(allocation_id):
 @role_required('superuser', 'admin', 'manager')
 def dashboard():
     """Manager dashboard with analytics and charts - with filtering"""
-    user = session.get('user', {})
-    
-    # Get filter parameters from request
-    filter_system = request.args.get('system', '')
-    filter_category = request.args.get('trial_category', '')
-    filter_therapeutic_area = request.args.get('therapeutic_area', '')
-    filter_test_engineer = request.args.get('test_engineer', '')
-    filter_role = request.args.get('role', '')
-    filter_trial_id = request.args.get('trial_id', '')
-    filter_created_by = request.args.get('created_by', '')
-    filter_start_date = request.args.get('start_date', '')
-    filter_end_date = request.args.get('end_date', '')
-    
-    # Get all allocations
-    all_allocations = get_all_allocations()
-    
-    # Apply filters
-    filtered_allocations = all_allocations
-    
-    if filter_system:
-        filtered_allocations = [a for a in filtered_allocations if a.get('system') == filter_system]
-    
-    if filter_category:
-        filtered_allocations = [a for a in filtered_allocations 
-                               if a.get('trial_category_type') == filter_category or 
-                               filter_category in a.get('trial_category', '')]
-    
-    if filter_therapeutic_area:
-        filtered_allocations = [a for a in filtered_allocations 
-                               if a.get('therapeutic_area_type') == filter_therapeutic_area or
-                               filter_therapeutic_area in a.get('therapeutic_area', '')]
-    
-    if filter_test_engineer:
-        filtered_allocations = [a for a in filtered_allocations 
-                               if a.get('test_engineer_name') == filter_test_engineer]
-    
-    if filter_role:
-        filtered_allocations = [a for a in filtered_allocations if a.get('role') == filter_role]
-    
-    if filter_trial_id:
-        filtered_allocations = [a for a in filtered_allocations 
-                               if filter_trial_id.lower() in a.get('trial_id', '').lower()]
-    
-    if filter_created_by:
-        filtered_allocations = [a for a in filtered_allocations 
-                               if a.get('created_by') == filter_created_by]
-    
-    # Date range filter
-    if filter_start_date:
-        try:
-            start_date = datetime.strptime(filter_start_date, '%Y-%m-%d').date()
-            filtered_allocations = [a for a in filtered_allocations 
-                                   if datetime.strptime(a.get('start_date', '2024-01-01'), '%Y-%m-%d').date() >= start_date]
-        except:
-            pass
-    
-    if filter_end_date:
-        try:
-            end_date = datetime.strptime(filter_end_date, '%Y-%m-%d').date()
-            filtered_allocations = [a for a in filtered_allocations 
-                                   if datetime.strptime(a.get('end_date', '2024-12-31'), '%Y-%m-%d').date() <= end_date]
-        except:
-            pass
-    
-    # Calculate statistics from filtered data
-    stats = {
-        'total': len(filtered_allocations),
-        'build': sum(1 for a in filtered_allocations if a.get('trial_category_type') == 'Build'),
-        'change_request': sum(1 for a in filtered_allocations if a.get('trial_category_type') == 'Change Request'),
-        'systems': len(set(a.get('system') for a in filtered_allocations if a.get('system')))
-    }
-    
-    # Calculate engineer efficiency from filtered data
-    efficiency_data = calculate_engineer_efficiency(filtered_allocations)
-    
-    # Get unique values for dropdowns (with None filtering)
-    systems = get_unique_sorted(a.get('system') for a in all_allocations if a.get('system'))
-    categories = get_unique_sorted(a.get('trial_category_type', 'Build') for a in all_allocations)
-    therapeutic_areas = get_unique_sorted(a.get('therapeutic_area_type') for a in all_allocations if a.get('therapeutic_area_type'))
-    test_engineers = get_unique_sorted(a.get('test_engineer_name') for a in all_allocations if a.get('test_engineer_name'))
-    roles = get_unique_sorted(a.get('role') for a in all_allocations if a.get('role'))
-    created_by_users = get_unique_sorted(a.get('created_by') for a in all_allocations if a.get('created_by'))
+    user = g.current_user
     
+    # Build the filter dict once; the service applies it in a single pass
+    current_filters = _build_allocation_filters(request.args)
+
+    # One pass over all allocations covers stats and every dropdown list
+    all_allocations = get_all_allocations()
+    summary = summarize_allocations(all_allocations)
+
+    if any(current_filters.values()):
+        filtered_allocations = query_allocations(current_filters)
+        stats = summarize_allocations(filtered_allocations)['stats']
+        # Filtered views need a live computation over the subset
+        efficiency_data = calculate_engineer_efficiency(filtered_allocations)
+    else:
+        filtered_allocations = all_allocations
+        stats = summary['stats']
+        efficiency_data = get_engineer_efficiency()
+
+    page_items, pagination = _paginate(filtered_allocations)
+
     return render_template('allocations/dashboard.html',
-                         allocations=filtered_allocations,
+                         allocations=page_items,
+                         pagination=pagination,
                          stats=stats,
                          efficiency_data=efficiency_data,
                          user=user,
                          # Filter options
-                         systems=systems,
-                         categories=categories,
-                         therapeutic_areas=therapeutic_areas,
-                         test_engineers=test_engineers,
-                         roles=roles,
-                         created_by_users=created_by_users,
+                         systems=summary['systems'],
+                         categories=summary['categories'],
+                         therapeutic_areas=summary['therapeutic_areas'],
+                         test_engineers=summary['test_engineers'],
+                         roles=summary['roles'],
+                         created_by_users=summary['created_by_users'],
                          # Current filters
-                         current_filters={
-                             'system': filter_system,
-                             'trial_category': filter_category,
-                             'therapeutic_area': filter_therapeutic_area,
-                             'test_engineer': filter_test_engineer,
-                             'role': filter_role,
-                             'trial_id': filter_trial_id,
-                             'created_by': filter_created_by,
-                             'start_date': filter_start_date,
-                             'end_date': filter_end_date
-                         })
+                         current_filters=current_filters)
 
 # ============================================================================
 # API ENDPOINTS (for AJAX and Charts)
@@ -481,17 +453,26 @@ def dashboard():
 @login_required
 def api_stats():
     """Get allocation statistics as JSON"""
-    stats = get_allocation_statistics()
-    return jsonify(stats)
+    etag = _api_etag()
+    if _not_modified(etag):
+        return '', 304
+
+    response = make_response(ojsonify(get_allocation_statistics()))
+    response.set_etag(etag)
+    return response
 
 @allocations_bp.route('/api/efficiency')
 @login_required
 @role_required('superuser', 'admin', 'manager')
 def api_efficiency():
     """Get engineer efficiency data as JSON"""
-    allocations = get_all_allocations()
-    efficiency_data = calculate_engineer_efficiency(allocations)
-    return jsonify(efficiency_data)
+    etag = _api_etag()
+    if _not_modified(etag):
+        return '', 304
+
+    response = make_response(ojsonify(get_engineer_efficiency()))
+    response.set_etag(etag)
+    return response
 
 @allocations_bp.route('/api/filter', methods=['POST'])
 @login_required
@@ -499,150 +480,73 @@ def api_filter():
     """Filter allocations via API"""
     filters = request.get_json()
     
-    # Convert date strings to date objects if present
-    if filters.get('start_date'):
-        try:
-            filters['start_date'] = datetime.strptime(filters['start_date'], '%Y-%m-%d').date()
-        except:
-            pass
-    
-    if filters.get('end_date'):
-        try:
-            filters['end_date'] = datetime.strptime(filters['end_date'], '%Y-%m-%d').date()
-        except:
-            pass
+    # Convert date strings to date objects; drop boundaries that fail to parse
+    for key in ('start_date', 'end_date'):
+        if filters.get(key):
+            parsed = _parse_iso_date(filters[key])
+            if parsed:
+                filters[key] = parsed
+            else:
+                filters.pop(key)
     
     filtered = search_allocations(filters)
     
-    user = session.get('user', {})
+    user = g.current_user
     role = user.get('role', '')
     
     # Filter by user if not admin/manager
-    if role not in ['superuser', 'admin', 'manager']:
+    if role not in _PRIVILEGED_ROLES:
         username = user.get('username', '')
         filtered = [a for a in filtered if a.get('created_by') == username]
     
-    return jsonify(filtered)
+    return ojsonify(filtered)
 
 @allocations_bp.route('/api/chart-data/<chart_type>')
 @login_required
 @role_required('superuser', 'admin', 'manager')
 def api_chart_data(chart_type):
     """Get chart data for dashboards with filters"""
-    # Get filter parameters
-    filter_system = request.args.get('system', '')
-    filter_category = request.args.get('trial_category', '')
-    filter_therapeutic_area = request.args.get('therapeutic_area', '')
-    filter_test_engineer = request.args.get('test_engineer', '')
-    filter_role = request.args.get('role', '')
-    filter_trial_id = request.args.get('trial_id', '')
-    filter_created_by = request.args.get('created_by', '')
-    filter_start_date = request.args.get('start_date', '')
-    filter_end_date = request.args.get('end_date', '')
-    
-    # Get all allocations
-    allocations = get_all_allocations()
-    
-    # Apply filters (same logic as dashboard)
-    if filter_system:
-        allocations = [a for a in allocations if a.get('system') == filter_system]
-    
-    if filter_category:
-        allocations = [a for a in allocations 
-                      if a.get('trial_category_type') == filter_category or 
-                      filter_category in a.get('trial_category', '')]
-    
-    if filter_therapeutic_area:
-        allocations = [a for a in allocations 
-                      if a.get('therapeutic_area_type') == filter_therapeutic_area or
-                      filter_therapeutic_area in a.get('therapeutic_area', '')]
-    
-    if filter_test_engineer:
-        allocations = [a for a in allocations 
-                      if a.get('test_engineer_name') == filter_test_engineer]
-    
-    if filter_role:
-        allocations = [a for a in allocations if a.get('role') == filter_role]
-    
-    if filter_trial_id:
-        allocations = [a for a in allocations 
-                      if filter_trial_id.lower() in a.get('trial_id', '').lower()]
-    
-    if filter_created_by:
-        allocations = [a for a in allocations 
-                      if a.get('created_by') == filter_created_by]
-    
-    if filter_start_date:
-        try:
-            start_date = datetime.strptime(filter_start_date, '%Y-%m-%d').date()
-            allocations = [a for a in allocations 
-                          if datetime.strptime(a.get('start_date', '2024-01-01'), '%Y-%m-%d').date() >= start_date]
-        except:
-            pass
-    
-    if filter_end_date:
-        try:
-            end_date = datetime.strptime(filter_end_date, '%Y-%m-%d').date()
-            allocations = [a for a in allocations 
-                          if datetime.strptime(a.get('end_date', '2024-12-31'), '%Y-%m-%d').date() <= end_date]
-        except:
-            pass
-    
-    # Generate chart data based on filtered allocations
-    if chart_type == 'system':
-        data = {}
-        for a in allocations:
-            system = a.get('system', 'Unknown')
-            data[system] = data.get(system, 0) + 1
-        return jsonify({'labels': list(data.keys()), 'values': list(data.values())})
-    
-    elif chart_type == 'category':
-        data = {'Build': 0, 'Change Request': 0}
-        for a in allocations:
-            cat_type = a.get('trial_category_type', 'Build')
-            if not cat_type:
-                cat_type = 'Change Request' if 'Change Request' in a.get('trial_category', '') else 'Build'
-            data[cat_type] = data.get(cat_type, 0) + 1
-        return jsonify({'labels': list(data.keys()), 'values': list(data.values())})
-    
-    elif chart_type == 'therapeutic_area':
-        data = {}
-        for a in allocations:
-            area_type = a.get('therapeutic_area_type', 'Unknown')
-            if not area_type:
-                area = a.get('therapeutic_area', 'Unknown')
-                area_type = 'Others' if 'Others -' in area else area
-            data[area_type] = data.get(area_type, 0) + 1
-        return jsonify({'labels': list(data.keys()), 'values': list(data.values())})
-    
-    elif chart_type == 'engineer_workload':
-        data = {}
-        for a in allocations:
-            engineer = a.get('test_engineer_name', 'Unknown')
-            data[engineer] = data.get(engineer, 0) + 1
-        sorted_data = dict(sorted(data.items(), key=lambda x: x[1], reverse=True)[:10])
-        return jsonify({'labels': list(sorted_data.keys()), 'values': list(sorted_data.values())})
-    
-    elif chart_type == 'monthly':
-        data = {}
-        for a in allocations:
-            try:
-                start = datetime.strptime(a.get('start_date', '2024-01-01'), '%Y-%m-%d')
-                month_key = start.strftime('%Y-%m')
-                data[month_key] = data.get(month_key, 0) + 1
-            except:
-                pass
-        sorted_data = dict(sorted(data.items()))
-        return jsonify({'labels': list(sorted_data.keys()), 'values': list(sorted_data.values())})
-    
-    else:
-        return jsonify({'error': 'Invalid chart type'}), 400
+    etag = _api_etag()
+    if _not_modified(etag):
+        return '', 304
+
+    # Same filter semantics as the dashboard, applied in one pass
+    filters = _build_allocation_filters(request.args)
+    datasets = get_chart_datasets(filters)
+    payload = datasets.get(chart_type)
+    if payload is None:
+        return ojsonify({'error': 'Invalid chart type'}), 400
+
+    response = make_response(ojsonify(payload))
+    response.set_etag(etag)
+    return response
+
+@allocations_bp.route('/api/chart-data-all')
+@login_required
+@role_required('superuser', 'admin', 'manager')
+def api_chart_data_all():
+    """Get every chart dataset in one response
+
+    A dashboard load needs all five charts; serving them from one pass
+    over the filtered allocations avoids five separate fetch + filter +
+    aggregate rounds.
+    """
+    etag = _api_etag()
+    if _not_modified(etag):
+        return '', 304
+
+    filters = _build_allocation_filters(request.args)
+    payload = get_chart_datasets(filters)
+
+    response = make_response(ojsonify(payload))
+    response.set_etag(etag)
+    return response
 
 @allocations_bp.route('/export/excel')
 @login_required
 def export_excel():
     """Export allocations to Excel"""
-    user = session.get('user', {})
+    user = g.current_user
     role = user.get('role', '')
     username = user.get('username', '')
     
@@ -654,35 +558,34 @@ def export_excel():
         return redirect(url_for('allocations.list_view'))
     
     try:
-        # Check if pandas is available
+        # Check if openpyxl is available
         try:
-            import pandas as pd  # type: ignore
+            from openpyxl import Workbook  # type: ignore
             from io import BytesIO
         except ImportError:
-            flash('Excel export requires pandas. Please install: pip install pandas openpyxl', 'danger')
+            flash('Excel export requires openpyxl. Please install: pip install openpyxl', 'danger')
             return redirect(url_for('allocations.list_view'))
-        
-        # Create DataFrame
-        df = pd.DataFrame(allocations)
-        
+
         # Select and order columns
-        columns = ['trial_id', 'test_engineer_name', 'system', 'trial_category', 
-                  'therapeutic_area', 'role', 'activity', 'start_date', 'end_date', 
+        columns = ['trial_id', 'test_engineer_name', 'system', 'trial_category',
+                  'therapeutic_area', 'role', 'activity', 'start_date', 'end_date',
                   'created_by', 'created_at']
-        
-        available_columns = [col for col in columns if col in df.columns]
-        df_export = df[available_columns]
-        
-        # Create Excel file
+
+        # Write-only mode streams rows instead of keeping a cell object
+        # per value in memory
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Allocations')
+        worksheet.append(columns)
+        for allocation in allocations:
+            worksheet.append([allocation.get(col, '') for col in columns])
+
         output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df_export.to_excel(writer, index=False, sheet_name='Allocations')
-        
+        workbook.save(output)
         output.seek(0)
         
         # Generate filename
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        if role in ['superuser', 'admin', 'manager']:
+        if role in _PRIVILEGED_ROLES:
             filename = f'all_allocations_{timestamp}.xlsx'
         else:
             filename = f'allocations_{username}_{timestamp}.xlsx'
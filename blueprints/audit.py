@@ -4,14 +4,32 @@ Handles trail audit documents recording by users
 Session-based authentication with role-based access
 ✅ WITH AUDIT REVIEWER ACCESS
 """
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, send_file
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, send_file, current_app, make_response, after_this_request
 from functools import wraps
+from hashlib import md5
 from datetime import datetime
-from io import BytesIO
+import os
+import tempfile
 from typing import Any, Dict, List, Set
 
+# Optional Excel support - imported once at module load so the first
+# export request does not pay the import cost (and a missing dependency
+# shows up at startup, not on the first download)
+try:
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+    print("⚠️  openpyxl not installed - Excel export disabled")
+
 from services.audit_service import (
     get_all_trail_documents,
+    iter_trail_documents,
+    query_trail_documents,
+    summarize_trail_documents,
+    get_trail_documents_summary,
+    get_trail_documents_version,
     get_trail_document_by_id,
     create_trail_document as service_create_trail_document,
     update_trail_document as service_update_trail_document,
@@ -22,6 +40,16 @@ from services.audit_service import (
 # Create Blueprint
 audit_bp = Blueprint('audit', __name__, url_prefix='/audit')
 
+# Roles that can see and edit every document; frozenset gives O(1) checks
+ADMIN_ROLES = frozenset({'superuser', 'admin', 'manager'})
+
+# Deleting other users' documents is restricted further
+DELETE_ROLES = frozenset({'superuser', 'admin'})
+
+# Fields every trail document submission must carry
+REQUIRED_FIELDS = ('trail', 'category', 'te1', 'te2', 'document_name',
+                   'te_document', 'uat_round', 'tmf_vault_id', 'go_live_date')
+
 # ============================================================================
 # AUTHENTICATION DECORATORS
 # ============================================================================
@@ -39,6 +67,7 @@ def login_required(f):
 
 def role_required(*roles):
     """Decorator to require specific roles"""
+    allowed = frozenset(roles)
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -47,7 +76,7 @@ def role_required(*roles):
                 return redirect(url_for('auth.login'))
             
             user = session.get('user', {})
-            if user.get('role') not in roles:
+            if user.get('role') not in allowed:
                 flash('You do not have permission to access this page.', 'danger')
                 return redirect(url_for('home.index'))
             
@@ -80,23 +109,47 @@ def audit_reviewer_required(f):
 # HELPER FUNCTIONS
 # ============================================================================
 
-def get_unique_sorted_values(items: List[Dict[str, Any]], key: str) -> List[str]:
-    """
-    Extract unique non-None values from a list of dictionaries and return sorted list.
-    
-    Args:
-        items: List of dictionaries
-        key: The key to extract values from
-    
-    Returns:
-        Sorted list of unique non-None string values
+_EXPORT_HEADERS = ('Trail', 'TE1', 'TE2', 'Document Name', 'Category',
+                   'TE Document', 'UAT Round', 'TMF/Vault ID', 'TE1 Approval',
+                   'TE2 Approval', 'CTDM Approval', 'Go Live Date',
+                   'Created By', 'Created At')
+
+# Document fields in header order; the Category column is special-cased
+# in document_export_row because it uses the stored category_display
+_EXPORT_KEYS = ('trail', 'te1', 'te2', 'document_name', 'category_display',
+                'te_document', 'uat_round', 'tmf_vault_id',
+                'te1_approval_date', 'te2_approval_date',
+                'ctdm_approval_date', 'go_live_date',
+                'created_by', 'created_at')
+
+
+def _page_etag(user: Dict[str, Any]) -> str:
+    """ETag for a list page: document store version + viewer + query string"""
+    key = (f"{get_trail_documents_version()}:{user.get('role', '')}:"
+           f"{user.get('username', '')}:{request.full_path}")
+    return md5(key.encode()).hexdigest()
+
+
+def _not_modified(etag: str) -> bool:
+    """True when the client already has this page and no flash is pending
+
+    A queued flash message must still be rendered, so those requests
+    always get a full response.
     """
-    unique_values: Set[str] = set()
-    for item in items:
-        value = item.get(key)
-        if value is not None and value != "":
-            unique_values.add(str(value))
-    return sorted(unique_values)
+    return request.if_none_match.contains(etag) and '_flashes' not in session
+
+
+def document_export_row(doc: Dict[str, Any]) -> List[Any]:
+    """Flatten one trail document into its Excel export row"""
+    row = [doc.get(key, 'N/A') for key in _EXPORT_KEYS]
+    if not doc.get('category_display'):
+        # category_display is stored at write time; derive it only for
+        # records created before the field existed
+        category_display = doc.get('category', 'N/A')
+        if doc.get('cr_number'):
+            category_display = f"{category_display} - {doc.get('cr_number')}"
+        row[4] = category_display
+    return row
 
 
 # ============================================================================
@@ -123,37 +176,34 @@ def trail_documents():
     role = user.get('role', 'user')
     username = user.get('username', '')
     is_reviewer = user.get('is_audit_reviewer', False)
-    
-    # Get all documents
-    all_documents = get_all_trail_documents()
-    
-    # Filter based on role
-    if role in ['superuser', 'admin', 'manager']:
-        documents = all_documents
+
+    # Identical page until a document changes - serve 304 on re-visits
+    etag = _page_etag(user)
+    if _not_modified(etag):
+        return '', 304
+
+    # Privileged roles see everything; others only their own documents
+    if role in ADMIN_ROLES:
+        documents = get_all_trail_documents()
     else:
-        documents = [d for d in all_documents if d.get('created_by') == username]
-    
-    # Calculate statistics
-    stats = {
-        'total': len(documents),
-        'te_docs': len([d for d in documents if d.get('te_document') == 'Yes']),
-        'build': len([d for d in documents if d.get('category') == 'Build']),
-        'change_request': len([d for d in documents if d.get('category') == 'Change Request'])
-    }
-    
-    # Get unique values for filters
-    trails = get_unique_sorted_values(documents, 'trail')
-    uat_rounds = get_unique_sorted_values(documents, 'uat_round')
-    tmf_ids = get_unique_sorted_values(documents, 'tmf_vault_id')
+        documents = query_trail_documents(created_by=username)
+
+    # Statistics and filter options in one pass (cached for the all-docs view)
+    if role in ADMIN_ROLES:
+        summary = get_trail_documents_summary()
+    else:
+        summary = summarize_trail_documents(documents)
     
-    return render_template('audit/trail_documents.html',
+    response = make_response(render_template('audit/trail_documents.html',
                          documents=documents,
-                         stats=stats,
-                         trails=trails,
-                         uat_rounds=uat_rounds,
-                         tmf_ids=tmf_ids,
+                         stats=summary['stats'],
+                         trails=summary['trails'],
+                         uat_rounds=summary['uat_rounds'],
+                         tmf_ids=summary['tmf_ids'],
                          user=user,
-                         is_reviewer=is_reviewer)
+                         is_reviewer=is_reviewer))
+    response.set_etag(etag)
+    return response
 
 
 @audit_bp.route('/trail-documents/create', methods=['GET', 'POST'])
@@ -164,16 +214,11 @@ def create_trail_document():
     username = user.get('username', '')
     
     if request.method == 'POST':
+        data = {}
         try:
             data = request.form.to_dict()
-            
-            # Debug: Print received data
-            print("="*60)
-            print("RECEIVED FORM DATA:")
-            for key, value in data.items():
-                print(f"  {key}: {value}")
-            print("="*60)
-            
+            current_app.logger.debug("Trail document POST data: %s", data)
+
             # Check for duplicate TMF/Vault ID
             tmf_vault_id = data.get('tmf_vault_id', '').strip()
             if tmf_vault_id:
@@ -186,14 +231,7 @@ def create_trail_document():
                                          action='create')
             
             # Validate required fields
-            required = ['trail', 'category', 'te1', 'te2', 'document_name', 
-                       'te_document', 'uat_round', 'tmf_vault_id', 'go_live_date']
-            
-            missing_fields = []
-            for field in required:
-                if not data.get(field):
-                    missing_fields.append(field)
-            
+            missing_fields = [field for field in REQUIRED_FIELDS if not data.get(field)]
             if missing_fields:
                 flash(f'❌ Missing required fields: {", ".join(missing_fields)}', 'danger')
                 return render_template('audit/trail_document_form.html',
@@ -233,14 +271,10 @@ def create_trail_document():
                                      action='create')
         
         except Exception as e:
-            print("="*60)
-            print(f"ERROR CREATING DOCUMENT: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            print("="*60)
+            current_app.logger.exception("Error creating trail document")
             flash(f'❌ Error creating document: {str(e)}', 'danger')
             return render_template('audit/trail_document_form.html',
-                                 form_data=request.form.to_dict(),
+                                 form_data=data or request.form.to_dict(),
                                  user=user,
                                  action='create')
     
@@ -264,15 +298,16 @@ def edit_trail_document(document_id):
         return redirect(url_for('audit.trail_documents'))
     
     # Check permissions
-    if role not in ['superuser', 'admin', 'manager']:
+    if role not in ADMIN_ROLES:
         if document.get('created_by') != username:
             flash('❌ You do not have permission to edit this document', 'danger')
             return redirect(url_for('audit.trail_documents'))
     
     if request.method == 'POST':
+        data = {}
         try:
             data = request.form.to_dict()
-            
+
             # Check for duplicate TMF/Vault ID (excluding current document)
             tmf_vault_id = data.get('tmf_vault_id', '').strip()
             if tmf_vault_id:
@@ -300,11 +335,11 @@ def edit_trail_document(document_id):
                                      action='edit')
         
         except Exception as e:
-            print(f"ERROR UPDATING DOCUMENT: {str(e)}")
+            current_app.logger.exception("Error updating trail document %s", document_id)
             flash(f'❌ Error updating document: {str(e)}', 'danger')
             return render_template('audit/trail_document_form.html',
                                  document=document,
-                                 form_data=request.form.to_dict(),
+                                 form_data=data or request.form.to_dict(),
                                  user=user,
                                  action='edit')
     
@@ -329,7 +364,7 @@ def delete_trail_document(document_id):
         return redirect(url_for('audit.trail_documents'))
     
     # Check permissions
-    if role not in ['superuser', 'admin']:
+    if role not in DELETE_ROLES:
         if document.get('created_by') != username:
             flash('❌ You do not have permission to delete this document', 'danger')
             return redirect(url_for('audit.trail_documents'))
@@ -360,14 +395,17 @@ def check_duplicate_tmf():
             return jsonify({'is_duplicate': False})
         
         is_duplicate, dup_info = check_duplicate_tmf_vault_id(tmf_vault_id, exclude_id)
-        
-        return jsonify({
+
+        response = jsonify({
             'is_duplicate': is_duplicate,
             'duplicate_info': dup_info if is_duplicate else None
         })
+        # Let the browser reuse the answer for quickly repeated checks
+        response.headers['Cache-Control'] = 'private, max-age=5'
+        return response
     
     except Exception as e:
-        print(f"ERROR in check_duplicate_tmf: {str(e)}")
+        current_app.logger.exception("Error in check_duplicate_tmf")
         return jsonify({'is_duplicate': False, 'error': str(e)})
 
 
@@ -376,60 +414,55 @@ def check_duplicate_tmf():
 @role_required('superuser', 'admin')
 def export_trail_documents():
     """Export trail documents to Excel"""
+    if not HAS_OPENPYXL:
+        flash('❌ Excel export requires openpyxl. Please install: pip install openpyxl', 'danger')
+        return redirect(url_for('audit.trail_documents'))
+
+    # Rebuilding the workbook for an unchanged store just re-serializes
+    # identical bytes - let the client reuse its copy instead
+    etag = _page_etag(session.get('user', {}))
+    if request.if_none_match.contains(etag):
+        return '', 304
+
     try:
-        import pandas as pd
-        
-        documents = get_all_trail_documents()
-        
-        if not documents:
+        if not get_trail_documents_summary()['stats']['total']:
             flash('⚠️ No documents to export', 'warning')
             return redirect(url_for('audit.trail_documents'))
-        
-        # Prepare data
-        excel_data = []
-        for doc in documents:
-            category_display = doc.get('category', 'N/A')
-            if doc.get('cr_number'):
-                category_display = f"{category_display} - {doc.get('cr_number')}"
-            
-            excel_data.append({
-                'Trail': doc.get('trail'),
-                'TE1': doc.get('te1'),
-                'TE2': doc.get('te2'),
-                'Document Name': doc.get('document_name'),
-                'Category': category_display,
-                'TE Document': doc.get('te_document'),
-                'UAT Round': doc.get('uat_round'),
-                'TMF/Vault ID': doc.get('tmf_vault_id'),
-                'TE1 Approval': doc.get('te1_approval_date', 'N/A'),
-                'TE2 Approval': doc.get('te2_approval_date', 'N/A'),
-                'CTDM Approval': doc.get('ctdm_approval_date', 'N/A'),
-                'Go Live Date': doc.get('go_live_date'),
-                'Created By': doc.get('created_by'),
-                'Created At': doc.get('created_at')
-            })
-        
-        df = pd.DataFrame(excel_data)
-        
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Trail Documents')
-        
-        output.seek(0)
-        
+
+        # Write-only mode streams rows straight off the document iterator:
+        # one row in memory at a time, no intermediate list or DataFrame
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Trail Documents')
+        worksheet.append(_EXPORT_HEADERS)
+        for doc in iter_trail_documents():
+            worksheet.append(document_export_row(doc))
+
+        # Serialize to a temp file so the response can be streamed off
+        # disk (sendfile) instead of holding the whole xlsx in memory
+        tmp = tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False)
+        tmp.close()
+        workbook.save(tmp.name)
+
+        @after_this_request
+        def _cleanup(response):
+            try:
+                os.unlink(tmp.name)
+            except OSError:
+                pass
+            return response
+
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'trail_documents_{timestamp}.xlsx'
-        
-        return send_file(
-            output,
+
+        response = send_file(
+            tmp.name,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
             download_name=filename
         )
-    
-    except ImportError:
-        flash('❌ Excel export requires pandas. Please install: pip install pandas openpyxl', 'danger')
-        return redirect(url_for('audit.trail_documents'))
+        response.set_etag(etag)
+        return response
+
     except Exception as e:
         flash(f'❌ Error exporting: {str(e)}', 'danger')
         return redirect(url_for('audit.trail_documents'))
@@ -449,51 +482,41 @@ def reviewer_all_documents():
     """
     user = session.get('user', {})
     username = user.get('username', '')
-    
-    # Get ALL documents (no filtering by creator)
-    all_documents = get_all_trail_documents()
-    
-    # Apply filters from query parameters
+
+    # Identical page until a document changes - serve 304 on re-visits
+    etag = _page_etag(user)
+    if _not_modified(etag):
+        return '', 304
+
+    # Apply filters from query parameters via the service
     trail_filter = request.args.get('trail', 'All')
     category_filter = request.args.get('category', 'All')
     uat_filter = request.args.get('uat_round', 'All')
     tmf_filter = request.args.get('tmf_vault_id', 'All')
     created_by_filter = request.args.get('created_by', 'All')
     
-    # Filter documents
-    filtered_docs = all_documents
-    if trail_filter != 'All':
-        filtered_docs = [d for d in filtered_docs if d.get('trail') == trail_filter]
-    if category_filter != 'All':
-        filtered_docs = [d for d in filtered_docs if d.get('category') == category_filter]
-    if uat_filter != 'All':
-        filtered_docs = [d for d in filtered_docs if d.get('uat_round') == uat_filter]
-    if tmf_filter != 'All':
-        filtered_docs = [d for d in filtered_docs if d.get('tmf_vault_id') == tmf_filter]
-    if created_by_filter != 'All':
-        filtered_docs = [d for d in filtered_docs if d.get('created_by') == created_by_filter]
-    
-    # Calculate statistics
-    stats = {
-        'total': len(filtered_docs),
-        'te_docs': len([d for d in filtered_docs if d.get('te_document') == 'Yes']),
-        'build': len([d for d in filtered_docs if d.get('category') == 'Build']),
-        'change_request': len([d for d in filtered_docs if d.get('category') == 'Change Request'])
-    }
-    
-    # Get unique values for filters (from all documents)
-    trails = get_unique_sorted_values(all_documents, 'trail')
-    uat_rounds = get_unique_sorted_values(all_documents, 'uat_round')
-    tmf_ids = get_unique_sorted_values(all_documents, 'tmf_vault_id')
-    created_by_list = get_unique_sorted_values(all_documents, 'created_by')
+    filtered_docs = query_trail_documents(
+        trail=None if trail_filter == 'All' else trail_filter,
+        category=None if category_filter == 'All' else category_filter,
+        uat_round=None if uat_filter == 'All' else uat_filter,
+        tmf_vault_id=None if tmf_filter == 'All' else tmf_filter,
+        created_by=None if created_by_filter == 'All' else created_by_filter
+    )
+    
+    # Filter options come from all documents (cached); stats from the filtered set
+    summary = get_trail_documents_summary()
+    if len(filtered_docs) == summary['stats']['total']:
+        stats = summary['stats']
+    else:
+        stats = summarize_trail_documents(filtered_docs)['stats']
     
-    return render_template('audit/reviewer_documents.html',
+    response = make_response(render_template('audit/reviewer_documents.html',
                          documents=filtered_docs,
                          stats=stats,
-                         trails=trails,
-                         uat_rounds=uat_rounds,
-                         tmf_ids=tmf_ids,
-                         created_by_list=created_by_list,
+                         trails=summary['trails'],
+                         uat_rounds=summary['uat_rounds'],
+                         tmf_ids=summary['tmf_ids'],
+                         created_by_list=summary['created_by_list'],
                          user=user,
                          read_only=True,
                          filters={
@@ -502,7 +525,9 @@ def reviewer_all_documents():
                              'uat_round': uat_filter,
                              'tmf_vault_id': tmf_filter,
                              'created_by': created_by_filter
-                         })
+                         }))
+    response.set_etag(etag)
+    return response
 
 
 @audit_bp.route('/reviewer/view/<document_id>')
@@ -534,90 +559,82 @@ def reviewer_export_documents():
     Export ALL trail documents to Excel (Audit Reviewer)
     Audit reviewers can download all documents
     """
+    if not HAS_OPENPYXL:
+        flash('❌ Excel export requires openpyxl. Please install: pip install openpyxl', 'danger')
+        return redirect(url_for('audit.reviewer_all_documents'))
+
+    # Rebuilding the workbook for an unchanged store just re-serializes
+    # identical bytes - let the client reuse its copy instead
+    etag = _page_etag(session.get('user', {}))
+    if request.if_none_match.contains(etag):
+        return '', 304
+
     try:
-        import pandas as pd
-        
-        # Get ALL documents
-        documents = get_all_trail_documents()
-        
-        if not documents:
-            flash('⚠️ No documents to export', 'warning')
-            return redirect(url_for('audit.reviewer_all_documents'))
-        
-        # Apply filters from query parameters
+        # Apply filters from query parameters via the service
         trail_filter = request.args.get('trail')
         category_filter = request.args.get('category')
         uat_filter = request.args.get('uat_round')
         tmf_filter = request.args.get('tmf_vault_id')
         created_by_filter = request.args.get('created_by')
         
-        # Filter documents
-        filtered_docs = documents
-        if trail_filter and trail_filter != 'All':
-            filtered_docs = [d for d in filtered_docs if d.get('trail') == trail_filter]
-        if category_filter and category_filter != 'All':
-            filtered_docs = [d for d in filtered_docs if d.get('category') == category_filter]
-        if uat_filter and uat_filter != 'All':
-            filtered_docs = [d for d in filtered_docs if d.get('uat_round') == uat_filter]
-        if tmf_filter and tmf_filter != 'All':
-            filtered_docs = [d for d in filtered_docs if d.get('tmf_vault_id') == tmf_filter]
-        if created_by_filter and created_by_filter != 'All':
-            filtered_docs = [d for d in filtered_docs if d.get('created_by') == created_by_filter]
-        
-        # Prepare data for Excel
-        excel_data = []
-        for doc in filtered_docs:
-            category_display = doc.get('category', 'N/A')
-            if doc.get('cr_number'):
-                category_display = f"{category_display} - {doc.get('cr_number')}"
-            
-            excel_data.append({
-                'Trail': doc.get('trail'),
-                'TE1': doc.get('te1'),
-                'TE2': doc.get('te2'),
-                'Document Name': doc.get('document_name'),
-                'Category': category_display,
-                'TE Document': doc.get('te_document'),
-                'UAT Round': doc.get('uat_round'),
-                'TMF/Vault ID': doc.get('tmf_vault_id'),
-                'TE1 Approval': doc.get('te1_approval_date', 'N/A'),
-                'TE2 Approval': doc.get('te2_approval_date', 'N/A'),
-                'CTDM Approval': doc.get('ctdm_approval_date', 'N/A'),
-                'Go Live Date': doc.get('go_live_date'),
-                'Created By': doc.get('created_by'),
-                'Created At': doc.get('created_at')
-            })
-        
-        df = pd.DataFrame(excel_data)
+        filtered_docs = query_trail_documents(
+            trail=None if not trail_filter or trail_filter == 'All' else trail_filter,
+            category=None if not category_filter or category_filter == 'All' else category_filter,
+            uat_round=None if not uat_filter or uat_filter == 'All' else uat_filter,
+            tmf_vault_id=None if not tmf_filter or tmf_filter == 'All' else tmf_filter,
+            created_by=None if not created_by_filter or created_by_filter == 'All' else created_by_filter
+        )
         
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Audit Trail Documents')
-            
-            # Auto-adjust column widths
-            worksheet = writer.sheets['Audit Trail Documents']
-            for idx, col in enumerate(df.columns):
-                max_length = max(
-                    df[col].astype(str).apply(len).max(),
-                    len(col)
-                ) + 2
-                worksheet.column_dimensions[chr(65 + idx)].width = min(max_length, 50)
+        if not filtered_docs:
+            flash('⚠️ No documents to export', 'warning')
+            return redirect(url_for('audit.reviewer_all_documents'))
         
-        output.seek(0)
+        # Flatten rows and track column widths in the same pass; widths
+        # must be known before streaming rows to a write-only sheet
+        rows = []
+        widths = [len(header) for header in _EXPORT_HEADERS]
+        for doc in filtered_docs:
+            row = document_export_row(doc)
+            for idx, value in enumerate(row):
+                length = len(str(value))
+                if length > widths[idx]:
+                    widths[idx] = length
+            rows.append(row)
         
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Audit Trail Documents')
+        for idx, width in enumerate(widths, 1):
+            worksheet.column_dimensions[get_column_letter(idx)].width = min(width + 2, 50)
+        worksheet.append(_EXPORT_HEADERS)
+        for row in rows:
+            worksheet.append(row)
+
+        # Serialize to a temp file so the response can be streamed off
+        # disk (sendfile) instead of holding the whole xlsx in memory
+        tmp = tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False)
+        tmp.close()
+        workbook.save(tmp.name)
+
+        @after_this_request
+        def _cleanup(response):
+            try:
+                os.unlink(tmp.name)
+            except OSError:
+                pass
+            return response
+
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'audit_trail_documents_{timestamp}.xlsx'
-        
-        return send_file(
-            output,
+
+        response = send_file(
+            tmp.name,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
             download_name=filename
         )
-    
-    except ImportError:
-        flash('❌ Excel export requires pandas. Please install: pip install pandas openpyxl', 'danger')
-        return redirect(url_for('audit.reviewer_all_documents'))
+        response.set_etag(etag)
+        return response
+
     except Exception as e:
         flash(f'❌ Error exporting: {str(e)}', 'danger')
         return redirect(url_for('audit.reviewer_all_documents'))
@@ -3,11 +3,13 @@ Authentication Blueprint - Flask Compatible
 Handles login, logout, registration, and password management
 ✅ WITH AUDIT REVIEWER SUPPORT
 """
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
 from functools import wraps
+from collections import deque
 from datetime import datetime
 from typing import Optional
 import re
+import time
 
 # Import services
 from services.user_service import (
@@ -15,6 +17,8 @@ from services.user_service import (
     get_user_by_username,
     get_user_by_email,
     get_all_users,
+    get_pending_user_indexes,
+    add_pending_user,
     change_password,
     reset_password,
     delete_user
@@ -23,14 +27,13 @@ from services.user_service import (
 # Import new functions for registration and password reset
 from utils.auth import hash_password
 from utils.database import (
-    load_pending_users,
-    save_pending_users,
     load_password_reset_requests,
     save_password_reset_requests,
     load_email_config
 )
+from utils.cache import cache
 from utils.validators import validate_email, validate_password, validate_username
-from utils.email_handler import send_email
+from utils.email_handler import send_email_async
 
 # Create blueprint
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
@@ -69,6 +72,60 @@ def role_required(*roles):
     return decorator
 
 
+# Cap on distinct clients a rate-limited endpoint tracks - the key comes
+# from a spoofable header, so the table must stay bounded
+_RATE_LIMIT_MAX_CLIENTS = 1024
+
+def rate_limit(max_requests: int, window_seconds: int):
+    """Decorator capping requests per client IP over a sliding window
+
+    In-process stand-in for Flask-Limiter: the availability-check
+    endpoints are fired per keystroke and are unauthenticated, so an
+    unthrottled client (or bot) can hammer the JSON store. Over the
+    limit the endpoint answers 429 without touching the services.
+
+    Idle clients are swept once per window and the table is hard-capped
+    at _RATE_LIMIT_MAX_CLIENTS, so spoofed X-Forwarded-For values
+    cannot grow memory for the life of the process.
+    """
+    def decorator(f):
+        hits = {}
+        last_sweep = [time.monotonic()]
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            now = time.monotonic()
+            ip = get_client_ip()
+            window = hits.setdefault(ip, deque())
+            while window and now - window[0] > window_seconds:
+                window.popleft()
+
+            if len(window) >= max_requests:
+                return jsonify({'error': 'Too many requests, slow down'}), 429
+
+            window.append(now)
+
+            # Evict idle clients on the sweep interval, and immediately
+            # once the table outgrows its cap
+            if now - last_sweep[0] > window_seconds or len(hits) > _RATE_LIMIT_MAX_CLIENTS:
+                for key in [k for k, w in hits.items()
+                            if k != ip and (not w or now - w[-1] > window_seconds)]:
+                    del hits[key]
+                if len(hits) > _RATE_LIMIT_MAX_CLIENTS:
+                    # every survivor is active - drop the longest idle
+                    excess = len(hits) - _RATE_LIMIT_MAX_CLIENTS
+                    for key in sorted((k for k in hits if k != ip),
+                                      key=lambda k: hits[k][-1])[:excess]:
+                        del hits[key]
+                last_sweep[0] = now
+
+            return f(*args, **kwargs)
+
+        decorated_function._hits = hits  # internal - inspected by tests
+        return decorated_function
+    return decorator
+
+
 def get_client_ip() -> str:
     """Get client IP address"""
     forwarded_for = request.headers.get('X-Forwarded-For')
@@ -96,19 +153,11 @@ def login():
             flash('Please enter both username and password.', 'danger')
             return render_template('auth/login.html')
         
-        # Authenticate user
+        # Authenticate user - returns the full record (minus the password
+        # hash) including is_audit_reviewer, so no second lookup is needed
         user = authenticate_user(username, password)
-        
+
         if user:
-            # ✅ CRITICAL FIX: Load full user data to get is_audit_reviewer flag
-            full_user = get_user_by_username(username)
-            
-            if full_user:
-                # Add audit reviewer flag to session user
-                user['is_audit_reviewer'] = full_user.get('is_audit_reviewer', False)
-            else:
-                user['is_audit_reviewer'] = False
-            
             # Store user in session
             session['user'] = user
             session['login_time'] = datetime.now().isoformat()
@@ -190,11 +239,9 @@ def register():
             flash('Email already registered. Please use a different email.', 'danger')
             return render_template('auth/login.html')
         
-        # Check pending users
-        pending_users = load_pending_users()
-        username_exists = any(p['username'] == username for p in pending_users)
-        
-        if username_exists:
+        # Check pending users (indexed - no list scan)
+        pending_by_username, _ = get_pending_user_indexes()
+        if username in pending_by_username:
             flash('Username already exists or pending approval!', 'danger')
             return render_template('auth/login.html')
         
@@ -203,6 +250,7 @@ def register():
             "username": username,
             "password": hash_password(password),
             "email": email,
+            "email_lc": email.lower(),
             "requested_role": requested_role,
             "status": "pending",
             "requested_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -210,9 +258,7 @@ def register():
             "audit_reviewer_justification": audit_justification if request_audit_reviewer else None
         }
         
-        pending_users.append(pending_user)
-        
-        if save_pending_users(pending_users):
+        if add_pending_user(pending_user):
             flash('✅ Registration submitted! Your account is pending Super User approval.', 'success')
             
             if requested_role == "cdp":
@@ -227,38 +273,19 @@ def register():
                 if config.get("enabled", False):
                     admin_email = config.get("admin_email", "")
                     if admin_email:
-                        role_emoji = "📊" if requested_role == "cdp" else "👤"
-                        
-                        email_body = f"""
-                        <h3>New User Registration</h3>
-                        <p>A new user has registered:</p>
-                        <ul>
-                            <li><strong>Username:</strong> {username}</li>
-                            <li><strong>Email:</strong> {email}</li>
-                            <li><strong>Requested Role:</strong> {role_emoji} {requested_role.upper()}</li>
-                            <li><strong>Requested At:</strong> {pending_user['requested_at']}</li>
-                        """
-                        
-                        if requested_role == "cdp":
-                            email_body += """
-                            <li><strong>⚠️ Special Access:</strong> CDP - Change Request Tracker Only</li>
-                        """
-                        
-                        if request_audit_reviewer:
-                            email_body += f"""
-                            <li><strong>⚠️ Audit Reviewer Access:</strong> REQUESTED 🔍</li>
-                            <li><strong>Justification:</strong> {audit_justification}</li>
-                        """
-                        
-                        email_body += """
-                        </ul>
-                        <p>Please log in to approve or reject this registration.</p>
-                        """
-                        
-                        send_email(admin_email, "New User Registration - Test Engineer Portal", email_body)
-            except Exception as e:
-                print(f"Failed to send email: {e}")
-            
+                        email_body = render_template(
+                            'emails/new_registration.html',
+                            username=username,
+                            email=email,
+                            requested_role=requested_role,
+                            requested_at=pending_user['requested_at'],
+                            request_audit_reviewer=request_audit_reviewer,
+                            audit_justification=audit_justification
+                        )
+                        send_email_async(admin_email, "New User Registration - Test Engineer Portal", email_body)
+            except Exception:
+                current_app.logger.exception("Failed to send registration email")
+
             return redirect(url_for('auth.login'))
         else:
             flash('Failed to submit registration. Please try again.', 'danger')
@@ -325,7 +352,8 @@ def forgot_password():
             flash('Username not found!', 'danger')
             return render_template('auth/login.html')
         
-        if user.get('email', '').lower() != email.lower():
+        stored_email_lc = user.get('email_lc') or user.get('email', '').lower()
+        if stored_email_lc != email.lower():
             flash("Email doesn't match our records!", 'danger')
             return render_template('auth/login.html')
         
@@ -364,32 +392,16 @@ def forgot_password():
                 if config.get("enabled", False):
                     admin_email = config.get("admin_email", "")
                     if admin_email:
-                        email_body = f"""
-                        <h3>🔑 New Password Reset Request</h3>
-                        <p>A user has requested a password reset:</p>
-                        <table style="width: 100%; border-collapse: collapse;">
-                          <tr style="background-color: #f8f9fa;">
-                            <td style="padding: 10px; border: 1px solid #ddd;"><strong>Username:</strong></td>
-                            <td style="padding: 10px; border: 1px solid #ddd;">{username}</td>
-                          </tr>
-                          <tr>
-                            <td style="padding: 10px; border: 1px solid #ddd;"><strong>Email:</strong></td>
-                            <td style="padding: 10px; border: 1px solid #ddd;">{email}</td>
-                          </tr>
-                          <tr style="background-color: #f8f9fa;">
-                            <td style="padding: 10px; border: 1px solid #ddd;"><strong>Reason:</strong></td>
-                            <td style="padding: 10px; border: 1px solid #ddd;">{reset_request['reason']}</td>
-                          </tr>
-                          <tr>
-                            <td style="padding: 10px; border: 1px solid #ddd;"><strong>Requested At:</strong></td>
-                            <td style="padding: 10px; border: 1px solid #ddd;">{reset_request['requested_at']}</td>
-                          </tr>
-                        </table>
-                        <p><strong>⚠️ Action Required:</strong> Please log in to approve or reject this request.</p>
-                        """
-                        send_email(admin_email, "Password Reset Request - Test Engineer Portal", email_body)
-            except Exception as e:
-                print(f"Failed to send email: {e}")
+                        email_body = render_template(
+                            'emails/password_reset.html',
+                            username=username,
+                            email=email,
+                            reason=reset_request['reason'],
+                            requested_at=reset_request['requested_at']
+                        )
+                        send_email_async(admin_email, "Password Reset Request - Test Engineer Portal", email_body)
+            except Exception:
+                current_app.logger.exception("Failed to send password reset email")
             
             return redirect(url_for('auth.login'))
         else:
@@ -403,20 +415,22 @@ def forgot_password():
 # ============================================================================
 
 @auth_bp.route('/api/check-username/<username>')
+@rate_limit(30, 60)
+@cache.cached(timeout=15)
 def check_username(username):
     """Check if username is available (API endpoint)"""
     user = get_user_by_username(username)
-    pending_users = load_pending_users()
-    pending_exists = any(p['username'] == username for p in pending_users)
-    
-    return jsonify({'available': user is None and not pending_exists})
+    pending_by_username, _ = get_pending_user_indexes()
+
+    return jsonify({'available': user is None and username not in pending_by_username})
 
 
 @auth_bp.route('/api/check-email/<email>')
+@rate_limit(30, 60)
+@cache.cached(timeout=15)
 def check_email(email):
     """Check if email is available (API endpoint)"""
     user = get_user_by_email(email)
-    pending_users = load_pending_users()
-    pending_exists = any(p['email'].lower() == email.lower() for p in pending_users)
-    
-    return jsonify({'available': user is None and not pending_exists})
\ No newline at end of file
+    _, pending_by_email = get_pending_user_indexes()
+
+    return jsonify({'available': user is None and email.lower() not in pending_by_email})
\ No newline at end of file
@@ -2,7 +2,7 @@
 Change Request Blueprint - Change request tracker
 Session-based authentication
 """
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, g, jsonify, session
 from functools import wraps
 
 change_request_bp = Blueprint('change_request', __name__, url_prefix='/change-request')
@@ -20,6 +20,13 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+@change_request_bp.before_request
+def _load_current_user():
+    """Read the session once per request; views use g instead"""
+    g.user = session.get('user', {})
+    g.role = g.user.get('role', 'user')
+    g.username = g.user.get('username', '')
+
 # ============================================================================
 # MAIN ROUTES
 # ============================================================================
@@ -28,9 +35,9 @@ def login_required(f):
 @login_required
 def main():
     """Change Request main page"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
+    user = g.user
+    role = g.role
+    username = g.username
     
     # TODO: Get actual change request statistics
     stats = {
@@ -49,9 +56,9 @@ def main():
 @login_required
 def list_view():
     """List all change requests"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
+    user = g.user
+    role = g.role
+    username = g.username
     
     # Get filter parameters
     status_filter = request.args.get('status', 'All')
@@ -97,8 +104,8 @@ def list_view():
 @login_required
 def create():
     """Create new change request"""
-    user = session.get('user', {})
-    username = user.get('username', '')
+    user = g.user
+    username = g.username
     
     if request.method == 'POST':
         # Get form data
@@ -124,9 +131,9 @@ def create():
 @login_required
 def view(cr_id):
     """View single change request"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
+    user = g.user
+    role = g.role
+    username = g.username
     
     # TODO: Get actual change request from service
     # Placeholder
@@ -157,9 +164,9 @@ def view(cr_id):
 @login_required
 def edit(cr_id):
     """Edit change request"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
+    user = g.user
+    role = g.role
+    username = g.username
     
     # TODO: Get actual change request from service
     # Placeholder
@@ -208,9 +215,9 @@ def edit(cr_id):
 @login_required
 def delete(cr_id):
     """Delete change request"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
+    user = g.user
+    role = g.role
+    username = g.username
     
     # TODO: Get actual change request from service
     # Placeholder
@@ -234,8 +241,8 @@ def delete(cr_id):
 @login_required
 def dashboard():
     """Change Request dashboard with statistics and charts"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
+    user = g.user
+    role = g.role
     
     # Check if user is manager/admin
     if role not in ['superuser', 'admin', 'manager']:
@@ -274,9 +281,9 @@ def dashboard():
 @login_required
 def api_list():
     """API endpoint to get change requests as JSON"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
+    user = g.user
+    role = g.role
+    username = g.username
     
     # TODO: Get actual change requests from service
     change_requests = []
@@ -3,18 +3,29 @@ Quality Blueprint - Complete Implementation
 Handles all quality-related routes including wizard flow
 Session-based authentication with therapeutic area and auto-round tracking
 """
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Blueprint, Response, render_template, request, redirect, url_for, flash, jsonify, session, g, stream_with_context
 from functools import wraps
+from hashlib import md5
+from uuid import uuid4
+import json
+from utils.cache import cache
 from services.quality_service import (
     create_record,
+    bulk_create_records,
     get_all_records,
     get_record_by_id,
     get_records_by_user,
+    get_recent_records_by_user,
     update_record,
     delete_record,
     get_unique_values,
     get_statistics,
-    get_requirement_round  # New function for auto-round calculation
+    get_dashboard_bundle,
+    get_max_requirement_round,
+    get_table_version,
+    get_wizard_state,
+    save_wizard_state,
+    clear_wizard_state
 )
 
 quality_bp = Blueprint('quality', __name__, url_prefix='/quality')
@@ -23,15 +34,69 @@ quality_bp = Blueprint('quality', __name__, url_prefix='/quality')
 # AUTHENTICATION DECORATOR
 # ============================================================================
 def login_required(f):
-    """Decorator to require login"""
+    """Decorator to require login
+
+    Also hoists the session lookups onto g so views read g.user/g.role/
+    g.username instead of re-walking the session dict.
+    """
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if 'user' not in session:
             flash('Please log in to access this page.', 'warning')
             return redirect(url_for('auth.login'))
+        g.user = session['user']
+        g.role = g.user.get('role', 'user')
+        g.username = g.user.get('username', '')
         return f(*args, **kwargs)
     return decorated_function
 
+# Query-param -> record-field pairs shared by the filtered endpoints
+_FILTER_PARAMS = (
+    ('trial_id', 'trial_id'),
+    ('phase', 'phase'),
+    ('type', 'type_of_requirement')
+)
+_DASHBOARD_FILTER_PARAMS = _FILTER_PARAMS + (('round', 'current_round'),)
+
+def _parse_filters(args, params):
+    """Build a filters dict from query args, reading each param exactly once
+
+    params is a sequence of (query-param, record-field) pairs; missing
+    values and the 'All' sentinel are dropped.
+    """
+    filters = {}
+    for param, field in params:
+        value = args.get(param)
+        if value and value != 'All':
+            filters[field] = value
+    return filters
+
+def _api_etag(role: str = '', username: str = '') -> str:
+    """ETag for the JSON endpoints: table version + viewer + query string
+
+    Pollers send If-None-Match back and get an empty 304 while nothing
+    has changed, skipping the query and serialization entirely.
+    """
+    key = f"{get_table_version()}:{role}:{username}:{request.full_path}"
+    return md5(key.encode()).hexdigest()
+
+def _paginate(records):
+    """Slice a record list according to ?page/?per_page (default 50, max 200)
+
+    Returns (page_records, page, per_page, total, pages).
+    """
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 50)), 1), 200)
+    except ValueError:
+        page, per_page = 1, 50
+
+    total = len(records)
+    pages = max((total + per_page - 1) // per_page, 1)
+    page = min(page, pages)
+    start = (page - 1) * per_page
+    return records[start:start + per_page], page, per_page, total, pages
+
 # ============================================================================
 # MAIN ROUTES
 # ============================================================================
@@ -40,8 +105,8 @@ def login_required(f):
 @login_required
 def main():
     """Quality main page - router based on role"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
+    user = g.user
+    role = g.role
     
     # Manager goes to dashboard
     if role == 'manager':
@@ -54,54 +119,29 @@ def main():
 @login_required
 def dashboard():
     """Quality dashboard with charts and metrics"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
+    user = g.user
+    role = g.role
+    username = g.username
     
     # Get filter parameters
-    trial_id = request.args.get('trial_id', 'All')
-    phase = request.args.get('phase', 'All')
-    req_type = request.args.get('type', 'All')
-    round_num = request.args.get('round', 'All')
-    
+    args = request.args
+    trial_id = args.get('trial_id', 'All')
+    phase = args.get('phase', 'All')
+    req_type = args.get('type', 'All')
+    round_num = args.get('round', 'All')
+
     # Build filters
-    filters = {}
-    if trial_id != 'All':
-        filters['trial_id'] = trial_id
-    if phase != 'All':
-        filters['phase'] = phase
-    if req_type != 'All':
-        filters['type_of_requirement'] = req_type
-    if round_num != 'All':
-        filters['current_round'] = int(round_num)
-    
-    # Get statistics
-    stats = get_statistics(filters if filters else None)
-    
-    # Get filter options
-    trial_ids = get_unique_values('trial_id')
-    phases = get_unique_values('phase')
-    types = get_unique_values('type_of_requirement')
-    rounds = get_unique_values('current_round')
-    
-    # Get filtered records for table
-    if role == 'user':
-        all_records = get_records_by_user(username)
-    else:
-        all_records = get_all_records()
-    
-    # Apply filters to records
-    filtered_records = all_records
-    for key, value in filters.items():
-        filtered_records = [r for r in filtered_records if str(r.get(key)) == str(value)]
+    filters = _parse_filters(args, _DASHBOARD_FILTER_PARAMS)
+    if 'current_round' in filters:
+        filters['current_round'] = int(filters['current_round'])
     
+    # Stats and filtered records in one scan; dropdown options are fetched
+    # lazily via /api/filter-options so the page renders without them
+    bundle = get_dashboard_bundle(filters or None, username, role, include_options=False)
+
     return render_template('quality/dashboard.html',
-                         stats=stats,
-                         records=filtered_records,
-                         trial_ids=trial_ids,
-                         phases=phases,
-                         types=types,
-                         rounds=rounds,
+                         stats=bundle['stats'],
+                         records=bundle['records'],
                          filters={'trial_id': trial_id, 'phase': phase, 'type': req_type, 'round': round_num},
                          user=user)
 
@@ -109,20 +149,19 @@ def dashboard():
 @login_required
 def create():
     """Create landing page - shows start wizard button"""
-    user = session.get('user', {})
-    username = user.get('username', '')
-    
-    # Get user's recent records
-    recent_records = get_records_by_user(username)
-    recent_records = sorted(recent_records, key=lambda x: x.get('created_at', ''), reverse=True)[:5]
+    user = g.user
+    username = g.username
     
+    # Get user's recent records (top 5 by created_at, selected in the service)
+    recent_records = get_recent_records_by_user(username, 5)
+
     return render_template('quality/create.html', recent_records=recent_records, user=user)
 
 @quality_bp.route('/wizard/trial-setup', methods=['GET', 'POST'])
 @login_required
 def trial_setup():
     """Wizard Step 1: Trial Setup"""
-    user = session.get('user', {})
+    user = g.user
     
     if request.method == 'POST':
         # Validate and save trial data to session
@@ -155,15 +194,20 @@ def trial_setup():
             flash('Number of rounds must be a valid number', 'danger')
             return render_template('quality/trial_setup.html', user=user)
         
-        # Save to session
-        session['wizard_trial_data'] = {
-            'trial_id': trial_id,
-            'phase': phase,
-            'therapeutic_area': therapeutic_area,
-            'no_of_rounds': int(no_of_rounds)
-        }
-        session['wizard_records'] = []
-        
+        # Save server-side; only the short wizard_id lives in the cookie
+        wizard_id = session.get('wizard_id') or uuid4().hex
+        session['wizard_id'] = wizard_id
+        save_wizard_state(wizard_id, {
+            'trial_data': {
+                'trial_id': trial_id,
+                'phase': phase,
+                'therapeutic_area': therapeutic_area,
+                'no_of_rounds': int(no_of_rounds)
+            },
+            'records': [],
+            'type_rounds': {}
+        })
+
         flash('Trial information saved! Proceed to record entry.', 'success')
         return redirect(url_for('quality.record_entry'))
     
@@ -173,16 +217,18 @@ def trial_setup():
 @login_required
 def record_entry():
     """Wizard Step 2: Record Entry"""
-    user = session.get('user', {})
-    username = user.get('username', '')
+    user = g.user
+    username = g.username
     
     # Check if trial data exists
-    if 'wizard_trial_data' not in session:
+    wizard_id = session.get('wizard_id')
+    wizard_state = get_wizard_state(wizard_id)
+    if not wizard_state:
         flash('No trial data found. Please start from Trial Setup.', 'warning')
         return redirect(url_for('quality.trial_setup'))
-    
-    trial_data = session['wizard_trial_data']
-    wizard_records = session.get('wizard_records', [])
+
+    trial_data = wizard_state['trial_data']
+    wizard_records = wizard_state.get('records', [])
     
     if request.method == 'POST':
         action = request.form.get('action')
@@ -228,15 +274,20 @@ def record_entry():
                         flash(f'Sum of failure reasons ({failure_sum}) cannot exceed total failures', 'danger')
                     else:
                         # Calculate requirement round (auto-increment per type)
-                        req_round = get_requirement_round(
-                            trial_data['trial_id'],
-                            type_of_requirement,  # Now safe - validated above
-                            wizard_records
-                        )
+                        # O(1): the per-type counter is kept in wizard state,
+                        # seeded from persisted records on first use
+                        type_rounds = wizard_state.setdefault('type_rounds', {})
+                        last_round = type_rounds.get(type_of_requirement)
+                        if last_round is None:
+                            last_round = get_max_requirement_round(
+                                trial_data['trial_id'], type_of_requirement)
+                        req_round = last_round + 1
+                        type_rounds[type_of_requirement] = req_round
                         record['requirement_round'] = req_round
-                        
+
                         wizard_records.append(record)
-                        session['wizard_records'] = wizard_records
+                        wizard_state['records'] = wizard_records
+                        save_wizard_state(wizard_id, wizard_state)
                         flash(f'✅ Record added! Total: {len(wizard_records)} | {type_of_requirement} Requirement Round: {req_round}', 'success')
                         return redirect(url_for('quality.record_entry'))
                 
@@ -244,25 +295,19 @@ def record_entry():
                 flash('Invalid numeric value', 'danger')
         
         elif action == 'save_all':
-            # Save all records
-            success_count = 0
-            error_count = 0
-            
-            for record in wizard_records:
-                # Merge trial data with record
-                full_record = {**trial_data, **record}
-                success, message = create_record(full_record, username)
-                if success:
-                    success_count += 1
-                else:
-                    error_count += 1
-                    flash(message, 'danger')
-            
+            # Save all records in one write; trial data is merged per record
+            # inside the service rather than copied here first
+            success_count, errors = bulk_create_records(wizard_records, username,
+                                                        base=trial_data)
+            error_count = len(errors)
+            for message in errors:
+                flash(message, 'danger')
+
             if success_count > 0:
                 flash(f'✅ Successfully saved {success_count} record(s)!', 'success')
                 # Clear wizard state
-                session.pop('wizard_trial_data', None)
-                session.pop('wizard_records', None)
+                clear_wizard_state(wizard_id)
+                session.pop('wizard_id', None)
                 return redirect(url_for('quality.view_records'))
             
             if error_count > 0:
@@ -271,8 +316,17 @@ def record_entry():
         elif action == 'remove_record':
             idx = int(request.form.get('record_index', -1))
             if 0 <= idx < len(wizard_records):
-                wizard_records.pop(idx)
-                session['wizard_records'] = wizard_records
+                removed = wizard_records.pop(idx)
+                wizard_state['records'] = wizard_records
+                # Rebuild the counter for the removed type so the next add
+                # reuses the freed round number (rare path, O(wizard))
+                removed_type = removed.get('type_of_requirement')
+                if removed_type:
+                    in_wizard = max((r.get('requirement_round', 0) for r in wizard_records
+                                     if r.get('type_of_requirement') == removed_type), default=0)
+                    persisted = get_max_requirement_round(trial_data['trial_id'], removed_type)
+                    wizard_state.setdefault('type_rounds', {})[removed_type] = max(in_wizard, persisted)
+                save_wizard_state(wizard_id, wizard_state)
                 flash('Record removed', 'info')
                 return redirect(url_for('quality.record_entry'))
     
@@ -281,43 +335,115 @@ def record_entry():
                          wizard_records=wizard_records,
                          user=user)
 
+@quality_bp.route('/wizard/add-records', methods=['POST'])
+@login_required
+def add_records_batch():
+    """Add many wizard records from a single JSON POST
+
+    Accepts a JSON list of record dicts and validates them all in one
+    pass, so entering a long wizard costs one HTTP round-trip instead of
+    one form POST per record. The classic add_record form remains as the
+    single-add fallback path.
+    """
+    wizard_id = session.get('wizard_id')
+    wizard_state = get_wizard_state(wizard_id)
+    if not wizard_state:
+        return jsonify({'error': 'No trial data found. Please start from Trial Setup.'}), 400
+
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, list) or not payload:
+        return jsonify({'error': 'Expected a non-empty JSON list of records'}), 400
+
+    trial_data = wizard_state['trial_data']
+    wizard_records = wizard_state.get('records', [])
+    type_rounds = wizard_state.setdefault('type_rounds', {})
+
+    int_fields = ('current_round', 'total_requirements', 'total_failures',
+                  'spec_issue', 'mock_crf_issue', 'programming_issue', 'scripting_issue')
+    text_fields = ('documentation_issues', 'timeline_adherence', 'system_deployment_delays')
+
+    added = 0
+    errors = []
+    for i, item in enumerate(payload):
+        if not isinstance(item, dict):
+            errors.append(f'Record {i + 1}: expected an object')
+            continue
+
+        type_of_requirement = str(item.get('type_of_requirement', '')).strip()
+        if not type_of_requirement:
+            errors.append(f'Record {i + 1}: type of requirement is required')
+            continue
+
+        record = {'type_of_requirement': type_of_requirement}
+        try:
+            for field in int_fields:
+                record[field] = int(item.get(field, 1 if field == 'current_round' else 0))
+        except (TypeError, ValueError):
+            errors.append(f'Record {i + 1}: invalid numeric value')
+            continue
+        for field in text_fields:
+            record[field] = str(item.get(field, '')).strip()
+
+        if record['total_requirements'] <= 0:
+            errors.append(f'Record {i + 1}: Total Requirements must be greater than 0')
+            continue
+        if record['total_failures'] > record['total_requirements']:
+            errors.append(f'Record {i + 1}: Total Failures cannot exceed Total Requirements')
+            continue
+        failure_sum = (record['spec_issue'] + record['mock_crf_issue'] +
+                       record['programming_issue'] + record['scripting_issue'])
+        if failure_sum > record['total_failures']:
+            errors.append(f'Record {i + 1}: sum of failure reasons ({failure_sum}) cannot exceed total failures')
+            continue
+
+        # Same O(1) per-type round counter as the single-add path
+        last_round = type_rounds.get(type_of_requirement)
+        if last_round is None:
+            last_round = get_max_requirement_round(trial_data['trial_id'], type_of_requirement)
+        record['requirement_round'] = last_round + 1
+        type_rounds[type_of_requirement] = record['requirement_round']
+
+        wizard_records.append(record)
+        added += 1
+
+    if added:
+        wizard_state['records'] = wizard_records
+        save_wizard_state(wizard_id, wizard_state)
+
+    return jsonify({'count': added, 'total': len(wizard_records), 'errors': errors})
+
 @quality_bp.route('/records')
 @login_required
 def view_records():
     """View quality records list"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
+    user = g.user
+    role = g.role
+    username = g.username
     
     # Get filter parameters
-    trial_id = request.args.get('trial_id', 'All')
-    phase = request.args.get('phase', 'All')
-    req_type = request.args.get('type', 'All')
-    
-    # Get records based on role
-    if role == 'user':
-        records = get_records_by_user(username)
-    else:
-        records = get_all_records()
-    
-    # Apply filters
-    if trial_id != 'All':
-        records = [r for r in records if r.get('trial_id') == trial_id]
-    if phase != 'All':
-        records = [r for r in records if r.get('phase') == phase]
-    if req_type != 'All':
-        records = [r for r in records if r.get('type_of_requirement') == req_type]
-    
-    # Get filter options
-    trial_ids = get_unique_values('trial_id')
-    phases = get_unique_values('phase')
-    types = get_unique_values('type_of_requirement')
-    
+    args = request.args
+    trial_id = args.get('trial_id', 'All')
+    phase = args.get('phase', 'All')
+    req_type = args.get('type', 'All')
+
+    # Build filters and push them into the data layer
+    filters = _parse_filters(args, _FILTER_PARAMS)
+
+    # Records and filter options in one scan (no stats needed here)
+    bundle = get_dashboard_bundle(filters or None, username, role, include_stats=False)
+
+    # Paginate so response size stays bounded as the table grows
+    page_records, page, per_page, total, pages = _paginate(bundle['records'])
+
     return render_template('quality/view.html',
-                         records=records,
-                         trial_ids=trial_ids,
-                         phases=phases,
-                         types=types,
+                         records=page_records,
+                         page=page,
+                         per_page=per_page,
+                         total=total,
+                         pages=pages,
+                         trial_ids=bundle['trial_ids'],
+                         phases=bundle['phases'],
+                         types=bundle['types'],
                          filters={'trial_id': trial_id, 'phase': phase, 'type': req_type},
                          user=user)
 
@@ -325,9 +451,9 @@ def view_records():
 @login_required
 def view_single(record_id):
     """View single quality record detail"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
+    user = g.user
+    role = g.role
+    username = g.username
     
     record = get_record_by_id(record_id)
     
@@ -347,9 +473,9 @@ def view_single(record_id):
 @login_required
 def edit(record_id):
     """Edit quality record"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
+    user = g.user
+    role = g.role
+    username = g.username
     
     record = get_record_by_id(record_id)
     
@@ -410,9 +536,9 @@ def edit(record_id):
 @login_required
 def delete_route(record_id):
     """Delete quality record"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
+    user = g.user
+    role = g.role
+    username = g.username
     
     record = get_record_by_id(record_id)
     
@@ -439,41 +565,79 @@ def delete_route(record_id):
 @login_required
 def clear_wizard():
     """Clear wizard state"""
-    session.pop('wizard_trial_data', None)
-    session.pop('wizard_records', None)
+    clear_wizard_state(session.pop('wizard_id', None))
     flash('Wizard cleared', 'info')
     return redirect(url_for('quality.main'))
 
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
+
+# URL segment -> record field for the lazy dropdown endpoints
+_FILTER_COLUMNS = {
+    'trial_id': 'trial_id',
+    'phase': 'phase',
+    'type': 'type_of_requirement',
+    'round': 'current_round'
+}
+
+@quality_bp.route('/api/filter-options/<column>')
+@login_required
+def api_filter_options(column):
+    """Distinct values for a filter dropdown (fetched lazily on focus)
+
+    No view-level cache here: get_unique_values is already memoized on
+    the table version, and a fixed-TTL response cache would keep serving
+    dropdowns without freshly created values until it expired.
+    """
+    field = _FILTER_COLUMNS.get(column)
+    if not field:
+        return jsonify({'error': 'Unknown filter column'}), 404
+    return jsonify(get_unique_values(field))
+
 @quality_bp.route('/api/statistics')
 @login_required
 def api_statistics():
     """API endpoint for dashboard statistics"""
-    filters = {}
-    
-    if request.args.get('trial_id') and request.args.get('trial_id') != 'All':
-        filters['trial_id'] = request.args.get('trial_id')
-    if request.args.get('phase') and request.args.get('phase') != 'All':
-        filters['phase'] = request.args.get('phase')
-    if request.args.get('type') and request.args.get('type') != 'All':
-        filters['type_of_requirement'] = request.args.get('type')
-    
+    etag = _api_etag()
+    if request.if_none_match.contains(etag):
+        return '', 304
+
+    filters = _parse_filters(request.args, _FILTER_PARAMS)
+
     stats = get_statistics(filters if filters else None)
-    return jsonify(stats)
+    response = jsonify(stats)
+    response.set_etag(etag)
+    return response
 
 @quality_bp.route('/api/records')
 @login_required
 def api_records():
     """API endpoint for records list"""
-    user = session.get('user', {})
-    role = user.get('role', 'user')
-    username = user.get('username', '')
-    
+    user = g.user
+    role = g.role
+    username = g.username
+
+    etag = _api_etag(role, username)
+    if request.if_none_match.contains(etag):
+        return '', 304
+
     if role == 'user':
         records = get_records_by_user(username)
     else:
         records = get_all_records()
-    
-    return jsonify(records)
\ No newline at end of file
+
+    page_records, page, per_page, total, pages = _paginate(records)
+
+    def _gen():
+        # Stream one row at a time so the encoded body is never held
+        # in memory alongside the record list
+        yield ('{"total": %d, "page": %d, "per_page": %d, "pages": %d, "records": ['
+               % (total, page, per_page, pages))
+        for i, record in enumerate(page_records):
+            yield (',' if i else '') + json.dumps(record)
+        yield ']}'
+
+    response = Response(stream_with_context(_gen()), mimetype='application/json')
+    response.set_etag(etag)
+    return response
\ No newline at end of file
@@ -3,13 +3,16 @@ UAT Blueprint - User Acceptance Testing records
 ✅ WITH EMAIL NOTIFICATIONS
 ✅ WITH DATE DIFFERENCE VALIDATION
 """
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, current_app, make_response
 from functools import wraps
+from hashlib import md5
 from datetime import datetime
-from config import EmailConfig, EMAIL_NOTIFICATION_SETTINGS, UAT_STATUS_OPTIONS, UAT_RESULT_OPTIONS
+from config import EmailConfig, EMAIL_NOTIFICATION_SETTINGS, UAT_STATUS_OPTIONS, UAT_RESULT_OPTIONS, ITEMS_PER_PAGE
 from services.uat_service import (
     create_uat_record, get_uat_records_by_role, get_uat_record_by_id,
-    update_uat_record, delete_uat_record, get_uat_statistics, get_trial_ids
+    update_uat_record, delete_uat_record, get_uat_statistics,
+    get_uat_statistics_by_role, get_uat_records_filtered, get_trial_ids,
+    get_table_version
 )
 
 uat_bp = Blueprint('uat', __name__, url_prefix='/uat')
@@ -27,6 +30,60 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def _paginate(records):
+    """Slice a record list according to ?page/?per_page
+
+    Defaults to ITEMS_PER_PAGE, capped at 200. Returns
+    (page_records, page, per_page, total, pages); out-of-range pages
+    clamp to the last page.
+    """
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', ITEMS_PER_PAGE)), 1), 200)
+    except ValueError:
+        page, per_page = 1, ITEMS_PER_PAGE
+
+    total = len(records)
+    pages = max((total + per_page - 1) // per_page, 1)
+    page = min(page, pages)
+    start = (page - 1) * per_page
+    return records[start:start + per_page], page, per_page, total, pages
+
+# Badge class / emoji pairs for the list page's display rows
+_STATUS_BADGES = {'Completed': ('bg-success', '✅'), 'In Progress': ('bg-warning', '🔄')}
+_RESULT_BADGES = {'Pass': ('bg-success', '✅'), 'Fail': ('bg-danger', '❌')}
+
+def _to_display_row(record):
+    """Copy of a record with the list page's display fields materialized
+
+    The template then does plain dict lookups per row instead of
+    branching on status/result/category; copying also keeps the shared
+    record cache out of reach of the render.
+    """
+    row = dict(record)
+    badge, emoji = _STATUS_BADGES.get(record.get('status'), ('bg-secondary', ''))
+    row['status_badge'] = badge
+    row['status_label'] = f"{emoji} {record.get('status', '')}".strip()
+    badge, emoji = _RESULT_BADGES.get(record.get('result'), ('bg-secondary', ''))
+    row['result_badge'] = badge
+    row['result_label'] = f"{emoji} {record.get('result', '')}".strip()
+    if record.get('category_type') == 'Build':
+        row['category_badge'], row['category_label'] = 'bg-primary', '🏗️ Build'
+    else:
+        row['category_badge'], row['category_label'] = 'bg-info', '🔄 CR'
+    return row
+
+def _page_etag(role, username):
+    """ETag for the read-only pages
+
+    The records file mtime is the version token, combined with the
+    viewer (results are role-scoped) and the full path (filters change
+    the page). Skipped entirely when flash messages are pending - those
+    pages must always render fresh.
+    """
+    raw = f"{get_table_version()}:{role}:{username}:{request.full_path}"
+    return md5(raw.encode()).hexdigest()
+
 # ============================================================================
 # EMAIL HELPER FUNCTIONS
 # ============================================================================
@@ -44,27 +101,27 @@ def send_uat_notification(record, action='created'):
         return
     
     try:
-        from utils.email_handler import send_email, create_uat_email_body
-        
+        from utils.email_handler import send_email_async, create_uat_email_body
+
         recipients = EmailConfig.get_recipients('admin')
-        
+
         if not recipients:
             print("⚠️  No recipients configured for UAT notifications")
             return
-        
+
+        # Capture request-bound data here - the request context is gone by
+        # the time the background thread runs
         portal_url = request.url_root if request else ""
         body_html = create_uat_email_body(record, action, portal_url)
         subject = f"UAT Record {action.capitalize()} - {record.get('trial_id', 'N/A')}"
-        
-        result = send_email(recipients, subject, body_html)
-        
-        if result['success']:
-            print(f"✅ Email notification sent for UAT {action}")
-        else:
-            print(f"❌ Failed to send email: {result['message']}")
-            
+
+        # SMTP round-trip happens off the request thread; send_email logs
+        # the outcome from the worker
+        send_email_async(recipients, subject, body_html)
+        print(f"📤 Email notification queued for UAT {action}")
+
     except Exception as e:
-        print(f"❌ Error sending email notification: {str(e)}")
+        print(f"❌ Error queueing email notification: {str(e)}")
 
 # ============================================================================
 # MAIN ROUTES
@@ -91,14 +148,23 @@ def dashboard():
     user = session.get('user', {})
     role = user.get('role', 'user')
     username = user.get('username', '')
-    
+
+    has_flashes = '_flashes' in session
+    etag = _page_etag(role, username)
+    if not has_flashes and request.if_none_match.contains(etag):
+        return '', 304
+
     records = get_uat_records_by_role(role, username)
-    stats = get_uat_statistics(records)
-    
-    return render_template('uat/dashboard.html', 
+    stats = get_uat_statistics_by_role(role, username)
+
+    response = make_response(render_template('uat/dashboard.html',
                          user=user,
                          stats=stats,
-                         records=records)
+                         records=records))
+    if not has_flashes:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, must-revalidate'
+    return response
 
 @uat_bp.route('/create', methods=['GET', 'POST'])
 @login_required
@@ -211,29 +277,47 @@ def view_list():
     user = session.get('user', {})
     role = user.get('role', 'user')
     username = user.get('username', '')
-    
-    records = get_uat_records_by_role(role, username)
-    stats = get_uat_statistics(records)
+
+    has_flashes = '_flashes' in session
+    etag = _page_etag(role, username)
+    if not has_flashes and request.if_none_match.contains(etag):
+        return '', 304
+
+    stats = get_uat_statistics_by_role(role, username)
     trial_ids = get_trial_ids()
-    
+
     # Get filter parameters
     filter_trial = request.args.get('trial_id', 'All')
     filter_status = request.args.get('status', 'All')
     filter_result = request.args.get('result', 'All')
     filter_category = request.args.get('category', 'All')
-    
-    # Apply filters
-    if filter_trial != 'All':
-        records = [r for r in records if r.get('trial_id') == filter_trial]
-    if filter_status != 'All':
-        records = [r for r in records if r.get('status') == filter_status]
-    if filter_result != 'All':
-        records = [r for r in records if r.get('result') == filter_result]
-    if filter_category != 'All':
-        records = [r for r in records if r.get('category_type') == filter_category]
-    
-    return render_template('uat/list.html', 
-                         records=records,
+
+    # The service resolves active filters against its column indexes
+    active_filters = {field: value for field, value in (
+        ('trial_id', filter_trial),
+        ('status', filter_status),
+        ('result', filter_result),
+        ('category_type', filter_category),
+    ) if value != 'All'}
+    records = get_uat_records_filtered(role, username, active_filters)
+
+    # Newest first, then slice the requested window - only the visible
+    # page is handed to Jinja
+    records = records[::-1]
+    page_records, page, per_page, total, pages = _paginate(records)
+
+    # Only the visible page gets its display fields materialized
+    records_view = [_to_display_row(r) for r in page_records]
+
+    response = make_response(render_template('uat/list.html',
+                         records=records_view,
+                         email_configured=EmailConfig.is_configured(),
+                         pagination={
+                             'page': page,
+                             'per_page': per_page,
+                             'total': total,
+                             'pages': pages
+                         },
                          stats=stats,
                          trial_ids=trial_ids,
                          user=user,
@@ -244,7 +328,11 @@ def view_list():
                              'category': filter_category
                          },
                          status_options=UAT_STATUS_OPTIONS,
-                         result_options=UAT_RESULT_OPTIONS)
+                         result_options=UAT_RESULT_OPTIONS))
+    if not has_flashes:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, must-revalidate'
+    return response
 
 @uat_bp.route('/view/<record_id>')
 @login_required
@@ -386,5 +474,41 @@ def send_email_notification(record_id):
     
     send_uat_notification(record, 'submitted')
     flash('📧 Email notification sent successfully!', 'success')
-    
-    return redirect(url_for('uat.view', record_id=record_id))
\ No newline at end of file
+
+    return redirect(url_for('uat.view', record_id=record_id))
+
+# Widgets the batch endpoint can serve
+_BATCH_WIDGETS = ('stats', 'records', 'trial_ids', 'email_config')
+
+@uat_bp.route('/batch', methods=['POST'])
+@login_required
+def batch():
+    """Aggregated JSON for dashboard widgets
+
+    Accepts {"requests": ["stats", "records", ...]} and returns every
+    requested widget in one response, so the client pays one round-trip
+    and one session decode instead of one per widget. All widgets read
+    from the version-keyed caches, so the whole batch costs at most one
+    file parse. Omitting "requests" returns every widget.
+    """
+    user = session.get('user', {})
+    role = user.get('role', 'user')
+    username = user.get('username', '')
+
+    payload = request.get_json(silent=True) or {}
+    requested = payload.get('requests') or list(_BATCH_WIDGETS)
+    unknown = [name for name in requested if name not in _BATCH_WIDGETS]
+    if unknown:
+        return jsonify({'error': f"Unknown widgets: {', '.join(unknown)}"}), 400
+
+    results = {}
+    if 'stats' in requested:
+        results['stats'] = get_uat_statistics_by_role(role, username)
+    if 'records' in requested:
+        results['records'] = get_uat_records_by_role(role, username)
+    if 'trial_ids' in requested:
+        results['trial_ids'] = get_trial_ids()
+    if 'email_config' in requested:
+        results['email_config'] = {'configured': EmailConfig.is_configured()}
+
+    return jsonify(results)
\ No newline at end of file
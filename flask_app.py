@@ -20,6 +20,26 @@ app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour
 
+# ============================================================================
+# SERVER-SIDE SESSIONS
+# ============================================================================
+# The session carries the full user dict; with signed-cookie sessions that
+# payload ships both ways on every request and risks the 4 KB cookie cap.
+# With Flask-Session installed the cookie shrinks to just a session id.
+# Optional - falls back to Flask's signed-cookie sessions when missing.
+try:
+    from flask_session import Session
+
+    app.config['SESSION_TYPE'] = 'filesystem'
+    app.config['SESSION_FILE_DIR'] = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '.flask_session'
+    )
+    app.config['SESSION_PERMANENT'] = False
+    Session(app)
+    print("✅ Server-side sessions enabled (filesystem)")
+except ImportError:
+    print("⚠️  Flask-Session not installed - using signed-cookie sessions")
+
 # ============================================================================
 # EMAIL CONFIGURATION
 # ============================================================================
@@ -28,6 +48,70 @@ email_config = EmailConfig.get_config_dict()
 for key, value in email_config.items():
     app.config[key] = value
 
+# ============================================================================
+# VIEW CACHING
+# ============================================================================
+from utils.cache import init_cache
+if init_cache(app):
+    print("✅ View caching enabled (SimpleCache)")
+
+# Memoized url_for - also available inside templates
+from utils.urls import cached_url_for
+app.jinja_env.globals['cached_url_for'] = cached_url_for
+
+# ============================================================================
+# TEMPLATE CACHING
+# ============================================================================
+# Skip the per-request template mtime check and keep compiled templates
+# across restarts. Only active when not in debug - debug keeps auto-reload
+# so template edits show up without restarting.
+#
+# app.debug is not set until app.run() in the __main__ block, so it
+# cannot be the guard here. Resolve the effective flag up front instead:
+# running this file directly is the dev entrypoint (debug by default),
+# while imports by a WSGI server default to production; FLASK_DEBUG
+# overrides either way.
+DEBUG_MODE = os.getenv(
+    'FLASK_DEBUG', '1' if __name__ == '__main__' else ''
+).lower() in ('1', 'true', 'on')
+app.debug = DEBUG_MODE
+
+if not app.debug:
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    app.jinja_env.auto_reload = False
+    # Never evict compiled templates - the template set is small and
+    # recompiling a hot one costs far more than keeping it resident
+    app.jinja_env.cache_size = -1
+
+    import jinja2
+    _bytecode_cache_dir = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '.jinja_cache'
+    )
+    try:
+        os.makedirs(_bytecode_cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = jinja2.FileSystemBytecodeCache(_bytecode_cache_dir)
+        print("✅ Jinja bytecode cache enabled")
+    except OSError:
+        print("⚠️  Could not create Jinja bytecode cache directory - skipping")
+
+    # Pre-warm the heaviest templates so the first request after a restart
+    # does not pay the compile cost
+    for _template_name in (
+        'audit/trail_documents.html',
+        'audit/trail_document_form.html',
+        'audit/reviewer_documents.html',
+        'allocations/dashboard.html',
+        'allocations/list.html',
+        'uat/list.html',
+        'uat/dashboard.html',
+        'quality/view.html',
+        'quality/dashboard.html',
+    ):
+        try:
+            app.jinja_env.get_template(_template_name)
+        except jinja2.TemplateError:
+            pass
+
 print("\n" + "="*60)
 print("📧 EMAIL CONFIGURATION")
 print("="*60)
@@ -138,22 +222,37 @@ def index():
 # ============================================================================
 # ERROR HANDLERS
 # ============================================================================
+# Fallback bodies built once at import - used when the error templates
+# themselves fail to render, so the handler just returns a constant
+def _build_error_page(title, heading, message):
+    return f'''
+        <html>
+        <head><title>{title}</title></head>
+        <body style="font-family: Arial; text-align: center; padding: 50px;">
+            <h1>{heading}</h1>
+            <p>{message}</p>
+            <a href="/">Go Home</a>
+        </body>
+        </html>
+        '''
+
+_ERROR_403_HTML = _build_error_page(
+    '403 Forbidden', '403 - Forbidden',
+    "You don't have permission to access this resource.")
+_ERROR_404_HTML = _build_error_page(
+    '404 Not Found', '404 - Page Not Found',
+    "The page you're looking for doesn't exist.")
+_ERROR_500_HTML = _build_error_page(
+    '500 Server Error', '500 - Server Error',
+    'Something went wrong on our end.')
+
 @app.errorhandler(403)
 def forbidden(e):
     """403 Forbidden handler"""
     try:
         return render_template('errors/403.html'), 403
     except:
-        return '''
-        <html>
-        <head><title>403 Forbidden</title></head>
-        <body style="font-family: Arial; text-align: center; padding: 50px;">
-            <h1>403 - Forbidden</h1>
-            <p>You don't have permission to access this resource.</p>
-            <a href="/">Go Home</a>
-        </body>
-        </html>
-        ''', 403
+        return _ERROR_403_HTML, 403
 
 @app.errorhandler(404)
 def not_found(e):
@@ -161,16 +260,7 @@ def not_found(e):
     try:
         return render_template('errors/404.html'), 404
     except:
-        return '''
-        <html>
-        <head><title>404 Not Found</title></head>
-        <body style="font-family: Arial; text-align: center; padding: 50px;">
-            <h1>404 - Page Not Found</h1>
-            <p>The page you're looking for doesn't exist.</p>
-            <a href="/">Go Home</a>
-        </body>
-        </html>
-        ''', 404
+        return _ERROR_404_HTML, 404
 
 @app.errorhandler(500)
 def server_error(e):
@@ -180,20 +270,11 @@ def server_error(e):
     print("SERVER ERROR:")
     print(traceback.format_exc())
     print("="*60)
-    
+
     try:
         return render_template('errors/500.html'), 500
     except:
-        return '''
-        <html>
-        <head><title>500 Server Error</title></head>
-        <body style="font-family: Arial; text-align: center; padding: 50px;">
-            <h1>500 - Server Error</h1>
-            <p>Something went wrong on our end.</p>
-            <a href="/">Go Home</a>
-        </body>
-        </html>
-        ''', 500
+        return _ERROR_500_HTML, 500
 
 # ============================================================================
 # CONTEXT PROCESSORS
@@ -439,4 +520,4 @@ if __name__ == '__main__':
     print("="*60 + "\n")
     
     # Development server
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=DEBUG_MODE, host='0.0.0.0', port=5000)
\ No newline at end of file
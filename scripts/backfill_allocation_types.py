@@ -0,0 +1,43 @@
+"""
+Backfill allocations.json - Set trial_category_type / therapeutic_area_type
+
+Older records only carry the freeform trial_category / therapeutic_area
+strings, which forces substring matching on every read. Derive the type
+fields once here so filters and charts can use plain equality checks.
+"""
+import json
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parents[1] / 'data'
+ALLOCATIONS_FILE = DATA_DIR / 'allocations.json'
+
+# Load current allocations
+with ALLOCATIONS_FILE.open('r', encoding='utf-8') as f:
+    records = json.load(f)
+
+fixed = 0
+for record in records:
+    # Only allocation records carry category/area fields
+    if record.get('record_type') == 'uat':
+        continue
+
+    if not record.get('trial_category_type'):
+        category = record.get('trial_category', 'Build')
+        record['trial_category_type'] = (
+            'Change Request' if 'Change Request' in category else 'Build'
+        )
+        fixed += 1
+        print(f"✅ Set trial_category_type={record['trial_category_type']} for {record.get('id')}")
+
+    if not record.get('therapeutic_area_type'):
+        area = record.get('therapeutic_area', '')
+        record['therapeutic_area_type'] = 'Others' if 'Others -' in area else area
+        fixed += 1
+        print(f"✅ Set therapeutic_area_type={record['therapeutic_area_type']} for {record.get('id')}")
+
+if fixed:
+    with ALLOCATIONS_FILE.open('w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2)
+    print(f"\n✅ Backfilled {fixed} field(s) in {ALLOCATIONS_FILE}")
+else:
+    print("✅ Nothing to backfill - all records already have type fields")
@@ -0,0 +1,34 @@
+"""
+Backfill trail_documents.json - Set category_display
+
+Newer records store a precomputed category_display (category plus CR
+number) so exports and views can read it directly instead of rebuilding
+the label per row. Derive it once here for older records.
+"""
+import json
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parents[1] / 'data'
+TRAIL_DOCUMENTS_FILE = DATA_DIR / 'trail_documents.json'
+
+# Load current trail documents
+with TRAIL_DOCUMENTS_FILE.open('r', encoding='utf-8') as f:
+    documents = json.load(f)
+
+fixed = 0
+for document in documents:
+    if document.get('category_display'):
+        continue
+
+    category = document.get('category', 'Build')
+    cr_number = document.get('cr_number', '')
+    document['category_display'] = f"{category} - {cr_number}" if cr_number else category
+    fixed += 1
+    print(f"✅ Set category_display={document['category_display']} for {document.get('id')}")
+
+if fixed:
+    with TRAIL_DOCUMENTS_FILE.open('w', encoding='utf-8') as f:
+        json.dump(documents, f, indent=2)
+    print(f"\n✅ Backfilled {fixed} document(s) in {TRAIL_DOCUMENTS_FILE}")
+else:
+    print("✅ Nothing to backfill - all documents already have category_display")
@@ -3,8 +3,9 @@ Allocation Service - Flask Compatible
 Handles all allocation-related business logic
 """
 import json
+from collections import Counter
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, date
 from typing import List, Dict, Optional, Tuple
 
 # Data file path
@@ -20,12 +21,32 @@ def _ensure_data_file():
             json.dump([], f, indent=4)
 
 
+# Parsed-file cache validated against the file's mtime. The dashboard, chart
+# and API routes all re-read allocations.json per request; with this cache the
+# JSON parse only happens when the file actually changed.
+_parsed_cache: Optional[Tuple[float, List[Dict]]] = None
+
+
+def _invalidate_cache():
+    """Forget cached file contents (after a failed or external write)"""
+    global _parsed_cache
+    _parsed_cache = None
+
+
 def _load_all_data() -> List[Dict]:
     """Load all data from file (including UAT records)"""
+    global _parsed_cache
     try:
         _ensure_data_file()
+
+        mtime = ALLOCATIONS_FILE.stat().st_mtime
+        if _parsed_cache and _parsed_cache[0] == mtime:
+            return _parsed_cache[1]
+
         with ALLOCATIONS_FILE.open('r', encoding='utf-8') as f:
-            return json.load(f)
+            data = json.load(f)
+        _parsed_cache = (mtime, data)
+        return data
     except Exception as e:
         print(f"Error loading data: {e}")
         return []
@@ -39,13 +60,16 @@ def _load_allocations() -> List[Dict]:
 
 def _save_all_data(data: List[Dict]) -> bool:
     """Save all data to file"""
+    global _parsed_cache
     try:
         _ensure_data_file()
         with ALLOCATIONS_FILE.open('w', encoding='utf-8') as f:
             json.dump(data, f, indent=4, ensure_ascii=False)
+        _parsed_cache = (ALLOCATIONS_FILE.stat().st_mtime, data)
         return True
     except Exception as e:
         print(f"Error saving data: {e}")
+        _invalidate_cache()
         return False
 
 
@@ -67,12 +91,9 @@ def get_all_allocations() -> List[Dict]:
 
 
 def get_allocation_by_id(allocation_id: str) -> Optional[Dict]:
-    """Get allocation by ID"""
-    allocations = _load_allocations()
-    for allocation in allocations:
-        if allocation.get('id') == allocation_id:
-            return allocation
-    return None
+    """Get allocation by ID via the id index - O(1) instead of a list scan"""
+    bucket = _get_field_indexes()['id'].get(allocation_id)
+    return bucket[0] if bucket else None
 
 
 def get_allocations_by_user(username: str) -> List[Dict]:
@@ -95,6 +116,205 @@ def get_allocations_by_role(role: str, username: str) -> List[Dict]:
         return get_allocations_by_user(username)
 
 
+def _parse_iso_date(value) -> Optional[date]:
+    """Parse an ISO YYYY-MM-DD string, returning None when invalid"""
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_allocations_version() -> str:
+    """Cheap change token for the allocations store
+
+    Derived from the file's mtime, so conditional API responses can tell
+    whether anything changed without loading or hashing the data.
+    """
+    try:
+        return str(ALLOCATIONS_FILE.stat().st_mtime_ns)
+    except OSError:
+        return '0'
+
+
+# In-memory equality indexes over the allocation list, rebuilt when the store
+# version changes. They stand in for the composite DB indexes a SQL backend
+# would carry for the dashboard filter combinations.
+_INDEXED_FIELDS = ('id', 'system', 'trial_category_type', 'therapeutic_area_type',
+                   'test_engineer_name', 'role', 'created_by')
+_field_indexes: Optional[Tuple[str, Dict[str, Dict[str, List[Dict]]]]] = None
+
+
+def _get_field_indexes() -> Dict[str, Dict[str, List[Dict]]]:
+    """Get per-field value -> rows indexes, rebuilt only on store changes"""
+    global _field_indexes
+    version = get_allocations_version()
+    if _field_indexes and _field_indexes[0] == version:
+        return _field_indexes[1]
+
+    indexes = {field: {} for field in _INDEXED_FIELDS}
+    for a in _load_allocations():
+        for field in _INDEXED_FIELDS:
+            # Mirror the filter predicates: category defaults to Build
+            if field == 'trial_category_type':
+                value = a.get(field, 'Build')
+            else:
+                value = a.get(field)
+            if value:
+                indexes[field].setdefault(value, []).append(a)
+
+    _field_indexes = (version, indexes)
+    return indexes
+
+
+def query_allocations(filters: Dict) -> List[Dict]:
+    """Filter allocations with a single pass over the store
+
+    Plays the role of a SQL WHERE clause for the JSON store: every active
+    filter is checked against each row once, instead of one full list
+    comprehension per filter as the dashboard and chart routes used to do.
+    Filter keys mirror the dashboard query parameters. Active equality
+    filters narrow the scan to the smallest matching index bucket first.
+    """
+    allocations = _load_allocations()
+
+    system = filters.get('system') or ''
+    category = filters.get('trial_category') or ''
+    area = filters.get('therapeutic_area') or ''
+    engineer = filters.get('test_engineer') or ''
+    role = filters.get('role') or ''
+    trial_id = (filters.get('trial_id') or '').lower()
+    created_by = filters.get('created_by') or ''
+
+    # Dates are stored as ISO YYYY-MM-DD strings, so lexicographic
+    # comparison is equivalent to comparing parsed dates and avoids a
+    # strptime call per row
+    start_bound = filters.get('start_date') or ''
+    end_bound = filters.get('end_date') or ''
+
+    # Start from the smallest index bucket among the active equality
+    # filters; the predicate loop below still re-checks every filter
+    indexes = _get_field_indexes()
+    for field, value in (('system', system),
+                         ('trial_category_type', category),
+                         ('therapeutic_area_type', area),
+                         ('test_engineer_name', engineer),
+                         ('role', role),
+                         ('created_by', created_by)):
+        if value:
+            bucket = indexes[field].get(value, [])
+            if len(bucket) < len(allocations):
+                allocations = bucket
+
+    result = []
+    for a in allocations:
+        if system and a.get('system') != system:
+            continue
+        if category and a.get('trial_category_type', 'Build') != category:
+            continue
+        if area and a.get('therapeutic_area_type') != area:
+            continue
+        if engineer and a.get('test_engineer_name') != engineer:
+            continue
+        if role and a.get('role') != role:
+            continue
+        if trial_id and trial_id not in a.get('trial_id', '').lower():
+            continue
+        if created_by and a.get('created_by') != created_by:
+            continue
+        if start_bound and a.get('start_date', '2024-01-01') < start_bound:
+            continue
+        if end_bound and a.get('end_date', '2024-12-31') > end_bound:
+            continue
+        result.append(a)
+
+    return result
+
+
+def get_chart_datasets(filters: Dict) -> Dict:
+    """Aggregate every chart dataset for the given filters
+
+    The blueprint used to hydrate the full row list just to count by one
+    column; this plays the role of GROUP BY ... COUNT(*) for the JSON
+    store and hands back only the K bucket labels/values per chart.
+    """
+    allocations = query_allocations(filters)
+
+    systems = Counter()
+    categories = {'Build': 0, 'Change Request': 0}
+    areas = Counter()
+    engineers = Counter()
+    months = Counter()
+    for a in allocations:
+        systems[a.get('system', 'Unknown')] += 1
+        cat_type = a.get('trial_category_type', 'Build')
+        categories[cat_type] = categories.get(cat_type, 0) + 1
+        areas[a.get('therapeutic_area_type', 'Unknown')] += 1
+        engineers[a.get('test_engineer_name', 'Unknown')] += 1
+        if a.get('start_date'):
+            months[a['start_date'][:7]] += 1
+
+    top_ten = engineers.most_common(10)
+    month_keys = sorted(months)
+    return {
+        'system': {'labels': list(systems.keys()), 'values': list(systems.values())},
+        'category': {'labels': list(categories.keys()), 'values': list(categories.values())},
+        'therapeutic_area': {'labels': list(areas.keys()), 'values': list(areas.values())},
+        'engineer_workload': {'labels': [name for name, _ in top_ten],
+                              'values': [count for _, count in top_ten]},
+        'monthly': {'labels': month_keys, 'values': [months[m] for m in month_keys]}
+    }
+
+
+def summarize_allocations(allocations: List[Dict]) -> Dict:
+    """Build dashboard stats and dropdown options in a single pass
+
+    Replaces the six get_unique_sorted() scans plus the per-stat sum()
+    scans the dashboard used to run over the same list. One loop fills
+    every set and counter, and the sets are sorted once at the end.
+    """
+    systems = set()
+    categories = set()
+    areas = set()
+    engineers = set()
+    roles = set()
+    creators = set()
+    build_count = 0
+    change_request_count = 0
+
+    for a in allocations:
+        if a.get('system'):
+            systems.add(a['system'])
+        category = a.get('trial_category_type', 'Build')
+        categories.add(category)
+        if category == 'Build':
+            build_count += 1
+        elif category == 'Change Request':
+            change_request_count += 1
+        if a.get('therapeutic_area_type'):
+            areas.add(a['therapeutic_area_type'])
+        if a.get('test_engineer_name'):
+            engineers.add(a['test_engineer_name'])
+        if a.get('role'):
+            roles.add(a['role'])
+        if a.get('created_by'):
+            creators.add(a['created_by'])
+
+    return {
+        'systems': sorted(systems),
+        'categories': sorted(categories),
+        'therapeutic_areas': sorted(areas),
+        'test_engineers': sorted(engineers),
+        'roles': sorted(roles),
+        'created_by_users': sorted(creators),
+        'stats': {
+            'total': len(allocations),
+            'build': build_count,
+            'change_request': change_request_count,
+            'systems': len(systems)
+        }
+    }
+
+
 def create_allocation_record(allocation_data: Dict, username: str) -> Tuple[bool, str]:
     """Create new allocation record"""
     try:
@@ -190,18 +410,12 @@ def get_allocation_statistics() -> Dict:
         system = allocation.get('system', 'Unknown')
         stats['by_system'][system] = stats['by_system'].get(system, 0) + 1
         
-        # Count by category
-        category_type = allocation.get('trial_category_type', 'Unknown')
-        if not category_type:
-            category = allocation.get('trial_category', 'Unknown')
-            category_type = 'Change Request' if 'Change Request' in category else 'Build'
+        # Count by category (type field is always written; see backfill script)
+        category_type = allocation.get('trial_category_type', 'Build')
         stats['by_category'][category_type] = stats['by_category'].get(category_type, 0) + 1
         
         # Count by therapeutic area
-        area_type = allocation.get('therapeutic_area_type', '')
-        if not area_type:
-            area = allocation.get('therapeutic_area', 'Unknown')
-            area_type = 'Others' if 'Others -' in area else area
+        area_type = allocation.get('therapeutic_area_type', 'Unknown')
         stats['by_therapeutic_area'][area_type] = stats['by_therapeutic_area'].get(area_type, 0) + 1
         
         # Count by engineer
@@ -219,6 +433,29 @@ def get_allocation_statistics() -> Dict:
     return stats
 
 
+# Materialized efficiency result for the unfiltered dashboard, keyed by the
+# store version so it refreshes only when allocations actually change.
+_efficiency_cache: Optional[Tuple[str, List[Dict]]] = None
+
+
+def get_engineer_efficiency() -> List[Dict]:
+    """Get the efficiency ranking over all allocations, cached per store version
+
+    The dashboard and /api/efficiency both want the unfiltered ranking;
+    recomputing it per request scans every allocation for no reason when
+    nothing changed. Filtered views still call
+    calculate_engineer_efficiency directly.
+    """
+    global _efficiency_cache
+    version = get_allocations_version()
+    if _efficiency_cache and _efficiency_cache[0] == version:
+        return _efficiency_cache[1]
+
+    result = calculate_engineer_efficiency(_load_allocations())
+    _efficiency_cache = (version, result)
+    return result
+
+
 def calculate_engineer_efficiency(allocations: List[Dict]) -> List[Dict]:
     """Calculate efficiency metrics for each engineer"""
     engineer_metrics = {}
@@ -245,13 +482,10 @@ def calculate_engineer_efficiency(allocations: List[Dict]) -> List[Dict]:
             engineer_metrics[engineer]['total_trials'].add(trial_id)
         
         # Calculate duration
-        try:
-            start_date = datetime.strptime(allocation.get('start_date', '2024-01-01'), '%Y-%m-%d')
-            end_date = datetime.strptime(allocation.get('end_date', '2024-12-31'), '%Y-%m-%d')
-            duration = (end_date - start_date).days
-            engineer_metrics[engineer]['total_days'] += duration
-        except:
-            pass
+        start_date = _parse_iso_date(allocation.get('start_date', '2024-01-01'))
+        end_date = _parse_iso_date(allocation.get('end_date', '2024-12-31'))
+        if start_date and end_date:
+            engineer_metrics[engineer]['total_days'] += (end_date - start_date).days
         
         # Count systems
         system = allocation.get('system')
@@ -260,9 +494,6 @@ def calculate_engineer_efficiency(allocations: List[Dict]) -> List[Dict]:
         
         # Count categories
         category_type = allocation.get('trial_category_type', 'Build')
-        if not category_type:
-            category = allocation.get('trial_category', 'Build')
-            category_type = 'Change Request' if 'Change Request' in category else 'Build'
         
         engineer_metrics[engineer]['categories'][category_type] += 1
     
@@ -293,21 +524,13 @@ def search_allocations(filters: Dict) -> List[Dict]:
         allocations = [a for a in allocations if a.get('system') == filters['system']]
     
     if filters.get('category') and filters['category'] != 'All':
-        if filters['category'] == 'Build':
-            allocations = [a for a in allocations 
-                          if a.get('trial_category_type') == 'Build' or a.get('trial_category') == 'Build']
-        elif filters['category'] == 'Change Request':
-            allocations = [a for a in allocations 
-                          if a.get('trial_category_type') == 'Change Request' or 'Change Request' in a.get('trial_category', '')]
+        allocations = [a for a in allocations
+                      if a.get('trial_category_type', 'Build') == filters['category']]
     
     if filters.get('therapeutic_area') and filters['therapeutic_area'] != 'All':
         area_filter = filters['therapeutic_area']
-        if area_filter == 'Others':
-            allocations = [a for a in allocations 
-                          if a.get('therapeutic_area_type') == 'Others' or 'Others -' in a.get('therapeutic_area', '')]
-        else:
-            allocations = [a for a in allocations 
-                          if a.get('therapeutic_area_type') == area_filter or area_filter in a.get('therapeutic_area', '')]
+        allocations = [a for a in allocations
+                      if a.get('therapeutic_area_type') == area_filter]
     
     if filters.get('engineer') and filters['engineer'] != 'All':
         allocations = [a for a in allocations if a.get('test_engineer_name') == filters['engineer']]
@@ -321,20 +544,17 @@ def search_allocations(filters: Dict) -> List[Dict]:
     if filters.get('created_by') and filters['created_by'] != 'All':
         allocations = [a for a in allocations if a.get('created_by') == filters['created_by']]
     
-    # Date filters
+    # Date filters (rows with unparseable dates are kept, matching the
+    # old behaviour of skipping the filter on parse errors)
     if filters.get('start_date'):
-        try:
-            allocations = [a for a in allocations 
-                          if datetime.strptime(a.get('start_date', '2024-01-01'), '%Y-%m-%d').date() >= filters['start_date']]
-        except:
-            pass
+        allocations = [a for a in allocations
+                      if (d := _parse_iso_date(a.get('start_date', '2024-01-01'))) is None
+                      or d >= filters['start_date']]
     
     if filters.get('end_date'):
-        try:
-            allocations = [a for a in allocations 
-                          if datetime.strptime(a.get('end_date', '2024-12-31'), '%Y-%m-%d').date() <= filters['end_date']]
-        except:
-            pass
+        allocations = [a for a in allocations
+                      if (d := _parse_iso_date(a.get('end_date', '2024-12-31'))) is None
+                      or d <= filters['end_date']]
     
     return allocations
 
@@ -4,7 +4,7 @@ Audit Service - Trail Documents and Audit Logging
 import uuid
 from datetime import datetime
 from typing import List, Dict, Any
-from utils.database import load_data, save_data
+from utils.database import load_data, save_data, DATA_DIR
 
 # ============================================================================
 # AUDIT LOGGING FUNCTIONS
@@ -47,49 +47,210 @@ def get_audit_statistics():
 # ============================================================================
 # TRAIL DOCUMENTS FUNCTIONS
 # ============================================================================
+
+# Parsed-file cache validated against the store's version token. The list,
+# reviewer and export pages re-read trail_documents.json per request; with
+# this cache the JSON parse only happens when the file actually changed.
+# Read-only: mutators load fresh via load_data and write via save_data.
+_documents_cache = None
+
+
+def _load_trail_documents():
+    """Load trail documents for read-only use, cached per store version"""
+    global _documents_cache
+    version = _get_trail_documents_version()
+    if _documents_cache and _documents_cache[0] == version:
+        return _documents_cache[1]
+
+    documents = load_data('trail_documents')
+    _documents_cache = (version, documents)
+    return documents
+
+
 def get_all_trail_documents():
     """Get all trail documents"""
-    return load_data('trail_documents')
+    return _load_trail_documents()
+
+def iter_trail_documents(trail=None, category=None, uat_round=None,
+                         tmf_vault_id=None, created_by=None):
+    """
+    Yield trail documents matching the given field values
+    Plays the role of an indexed WHERE clause for the JSON store: every
+    active filter is checked in one pass per document instead of one
+    list comprehension per filter. None means "no filter". Export paths
+    iterate this directly so no filtered copy is materialized.
+    """
+    for doc in _load_trail_documents():
+        if trail and doc.get('trail') != trail:
+            continue
+        if category and doc.get('category') != category:
+            continue
+        if uat_round and doc.get('uat_round') != uat_round:
+            continue
+        if tmf_vault_id and doc.get('tmf_vault_id') != tmf_vault_id:
+            continue
+        if created_by and doc.get('created_by') != created_by:
+            continue
+        yield doc
+
+
+def query_trail_documents(trail=None, category=None, uat_round=None,
+                          tmf_vault_id=None, created_by=None):
+    """Get trail documents matching the given field values, as a list"""
+    if not any((trail, category, uat_round, tmf_vault_id, created_by)):
+        return _load_trail_documents()
+
+    return list(iter_trail_documents(trail=trail, category=category,
+                                     uat_round=uat_round,
+                                     tmf_vault_id=tmf_vault_id,
+                                     created_by=created_by))
+
+def summarize_trail_documents(documents):
+    """
+    Compute document statistics and filter option lists in a single pass
+    Returns a dict with a 'stats' dict plus sorted 'trails', 'uat_rounds',
+    'tmf_ids' and 'created_by_list' option lists.
+    """
+    te_docs = build = change_request = 0
+    trails = set()
+    uat_rounds = set()
+    tmf_ids = set()
+    creators = set()
+    
+    for document in documents:
+        if document.get('te_document') == 'Yes':
+            te_docs += 1
+        category = document.get('category')
+        if category == 'Build':
+            build += 1
+        elif category == 'Change Request':
+            change_request += 1
+        for values, key in ((trails, 'trail'),
+                            (uat_rounds, 'uat_round'),
+                            (tmf_ids, 'tmf_vault_id'),
+                            (creators, 'created_by')):
+            value = document.get(key)
+            if value is not None and value != "":
+                values.add(str(value))
+    
+    return {
+        'stats': {
+            'total': len(documents),
+            'te_docs': te_docs,
+            'build': build,
+            'change_request': change_request
+        },
+        'trails': sorted(trails),
+        'uat_rounds': sorted(uat_rounds),
+        'tmf_ids': sorted(tmf_ids),
+        'created_by_list': sorted(creators)
+    }
+
+
+# Cached all-documents summary; the version token changes whenever a
+# document is created, updated or deleted, so no explicit invalidation
+# hooks are needed in the mutators.
+_summary_cache = None
+
+
+def get_trail_documents_summary():
+    """Get the stats/filter-options summary over all documents, cached per store version"""
+    global _summary_cache
+    version = _get_trail_documents_version()
+    if _summary_cache and _summary_cache[0] == version:
+        return _summary_cache[1]
+    
+    summary = summarize_trail_documents(_load_trail_documents())
+    _summary_cache = (version, summary)
+    return summary
+
 
 def get_trail_document_by_id(document_id):
-    """Get trail document by ID"""
-    documents = load_data('trail_documents')
+    """Get trail document by ID (read-only view)"""
+    documents = _load_trail_documents()
     return next((d for d in documents if d.get('id') == document_id), None)
 
+# TMF/Vault ID index keyed by the trail documents file's mtime. The duplicate
+# check runs on every create/edit POST and on every keystroke via the
+# check-duplicate AJAX endpoint, so it must be a point lookup, not a scan.
+_TRAIL_DOCUMENTS_FILE = DATA_DIR / 'trail_documents.json'
+_tmf_index = None
+
+
+def _get_trail_documents_version():
+    """Change token for the trail documents store"""
+    try:
+        return str(_TRAIL_DOCUMENTS_FILE.stat().st_mtime_ns)
+    except OSError:
+        return '0'
+
+
+def get_trail_documents_version():
+    """Public change token for conditional responses (ETags)"""
+    return _get_trail_documents_version()
+
+
+def _get_tmf_index():
+    """Get the uppercase TMF/Vault ID -> documents index, rebuilt on change"""
+    global _tmf_index
+    version = _get_trail_documents_version()
+    if _tmf_index and _tmf_index[0] == version:
+        return _tmf_index[1]
+    
+    index = {}
+    for doc in _load_trail_documents():
+        tmf = doc.get('tmf_vault_id', '').strip().upper()
+        if tmf:
+            index.setdefault(tmf, []).append(doc)
+    
+    _tmf_index = (version, index)
+    return index
+
+
 def check_duplicate_tmf_vault_id(tmf_vault_id, exclude_id=None):
     """
-    Check if TMF/Vault ID already exists
+    Check if TMF/Vault ID already exists (case-insensitive, indexed lookup)
     Returns: (is_duplicate, duplicate_document_info)
     """
     if not tmf_vault_id or not tmf_vault_id.strip():
         return False, {}
     
-    documents = load_data('trail_documents')
-    tmf_vault_id_upper = tmf_vault_id.strip().upper()
-    
-    for doc in documents:
+    for doc in _get_tmf_index().get(tmf_vault_id.strip().upper(), []):
         # Skip the document being edited
         if exclude_id and doc.get('id') == exclude_id:
             continue
         
-        # Compare TMF/Vault IDs (case-insensitive)
-        if doc.get('tmf_vault_id', '').strip().upper() == tmf_vault_id_upper:
-            duplicate_info = {
-                'id': doc.get('id'),
-                'trail': doc.get('trail', 'Unknown'),
-                'document_name': doc.get('document_name', 'Unknown'),
-                'created_by': doc.get('created_by', 'Unknown'),
-                'created_at': doc.get('created_at', 'N/A'),
-                'category': doc.get('category', 'Unknown'),
-                'uat_round': doc.get('uat_round', 'N/A')
-            }
-            return True, duplicate_info
+        duplicate_info = {
+            'id': doc.get('id'),
+            'trail': doc.get('trail', 'Unknown'),
+            'document_name': doc.get('document_name', 'Unknown'),
+            'created_by': doc.get('created_by', 'Unknown'),
+            'created_at': doc.get('created_at', 'N/A'),
+            'category': doc.get('category', 'Unknown'),
+            'uat_round': doc.get('uat_round', 'N/A')
+        }
+        return True, duplicate_info
     
     return False, {}
 
+def build_category_display(category, cr_number):
+    """Human-readable category label, e.g. 'Change Request - CR-123'"""
+    if cr_number:
+        return f"{category} - {cr_number}"
+    return category
+
+
 def create_trail_document(data):
     """Create new trail document"""
     try:
+        # Re-check inside the write path so the gap between the form's
+        # duplicate check and the save cannot create duplicates
+        tmf_vault_id = data.get('tmf_vault_id', '').strip()
+        if tmf_vault_id:
+            is_duplicate, dup_info = check_duplicate_tmf_vault_id(tmf_vault_id)
+            if is_duplicate:
+                return False, f"TMF/Vault ID already exists in Trail: {dup_info.get('trail')}"
+        
         documents = load_data('trail_documents')
         
         # Generate unique ID
@@ -101,6 +262,9 @@ def create_trail_document(data):
             'trail': data.get('trail', '').strip(),
             'category': data.get('category', 'Build'),
             'cr_number': data.get('cr_number', '').strip(),
+            'category_display': build_category_display(
+                data.get('category', 'Build'), data.get('cr_number', '').strip()
+            ),
             'te1': data.get('te1', '').strip(),
             'te2': data.get('te2', '').strip(),
             'document_name': data.get('document_name', '').strip(),
@@ -155,6 +319,9 @@ def update_trail_document(document_id, data):
         document['trail'] = data.get('trail', '').strip()
         document['category'] = data.get('category', 'Build')
         document['cr_number'] = data.get('cr_number', '').strip()
+        document['category_display'] = build_category_display(
+            document['category'], document['cr_number']
+        )
         document['te1'] = data.get('te1', '').strip()
         document['te2'] = data.get('te2', '').strip()
         document['document_name'] = data.get('document_name', '').strip()
@@ -2,15 +2,23 @@
 Quality Service - Flask Compatible
 Handles business logic for quality records with auto-requirement round tracking
 """
+import heapq
 import json
 import uuid
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Tuple
 
+from utils.cache import cache
+
 # Data file paths
 DATA_DIR = Path(__file__).resolve().parents[1] / 'data'
 QUALITY_FILE = DATA_DIR / 'quality_records.json'
+WIZARD_FILE = DATA_DIR / 'quality_wizard_sessions.json'
+
+# Abandoned wizard sessions are pruned after this many hours
+_WIZARD_MAX_AGE_HOURS = 24
 
 def _ensure_data_file():
     """Ensure data directory and file exist"""
@@ -38,17 +46,72 @@ def _save_records(records: List[Dict]) -> bool:
         print(f"Error saving quality records: {e}")
         return False
 
-def generate_record_id() -> str:
-    """Generate unique record ID"""
-    records = _load_records()
+# ============================================================================
+# WIZARD SESSION STORE
+# ============================================================================
+# Wizard state (trial data + in-progress records) lives here instead of the
+# Flask session so the client cookie stays O(1) no matter how many records
+# the wizard accumulates; only the short wizard_id travels with the request.
+
+def _load_wizard_sessions() -> Dict[str, Dict]:
+    """Load all wizard sessions keyed by wizard_id"""
+    try:
+        if WIZARD_FILE.exists():
+            with WIZARD_FILE.open('r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+    except Exception as e:
+        print(f"Error loading wizard sessions: {e}")
+        return {}
+
+def _save_wizard_sessions(sessions: Dict[str, Dict]) -> bool:
+    """Save wizard sessions to file"""
+    try:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        with WIZARD_FILE.open('w', encoding='utf-8') as f:
+            json.dump(sessions, f, indent=2, ensure_ascii=False)
+        return True
+    except Exception as e:
+        print(f"Error saving wizard sessions: {e}")
+        return False
+
+def get_wizard_state(wizard_id: Optional[str]) -> Optional[Dict]:
+    """Get wizard state ({'trial_data': ..., 'records': [...]}) by id"""
+    if not wizard_id:
+        return None
+    return _load_wizard_sessions().get(wizard_id)
+
+def save_wizard_state(wizard_id: str, state: Dict) -> bool:
+    """Save wizard state, pruning abandoned sessions as a side effect"""
+    sessions = _load_wizard_sessions()
+    state['updated_at'] = datetime.utcnow().isoformat()
+    sessions[wizard_id] = state
+    cutoff = (datetime.utcnow() - timedelta(hours=_WIZARD_MAX_AGE_HOURS)).isoformat()
+    sessions = {wid: s for wid, s in sessions.items()
+                if wid == wizard_id or s.get('updated_at', '') >= cutoff}
+    return _save_wizard_sessions(sessions)
+
+def clear_wizard_state(wizard_id: Optional[str]) -> bool:
+    """Drop wizard state after save_all or an explicit clear"""
+    sessions = _load_wizard_sessions()
+    if wizard_id in sessions:
+        del sessions[wizard_id]
+        return _save_wizard_sessions(sessions)
+    return True
+
+def _next_record_number(records: List[Dict]) -> int:
+    """Next sequential QM number for an already-loaded record list"""
     if not records:
-        return "QM001"
-    
+        return 1
     try:
-        last_id = max([int(r['record_id'][2:]) for r in records if r.get('record_id', '').startswith('QM')])
-        return f"QM{str(last_id + 1).zfill(3)}"
+        return max(int(r['record_id'][2:]) for r in records
+                   if r.get('record_id', '').startswith('QM')) + 1
     except (ValueError, KeyError):
-        return f"QM{len(records) + 1:03d}"
+        return len(records) + 1
+
+def generate_record_id() -> str:
+    """Generate unique record ID"""
+    return f"QM{_next_record_number(_load_records()):03d}"
 
 def calculate_defect_density(total_requirements: int, total_failures: int) -> float:
     """Calculate defect density percentage"""
@@ -85,80 +148,247 @@ def get_requirement_round(trial_id: str, requirement_type: str, wizard_records:
     max_req_round = max([r.get('requirement_round', 0) for r in trial_records])
     return max_req_round + 1
 
+def _build_record(record_data: dict, username: str, record_id: str,
+                  base: Optional[Dict] = None) -> Tuple[Optional[Dict], str]:
+    """Normalize and validate one record; returns (record, '') or (None, error)
+
+    base holds fields shared by a whole batch (the wizard's trial data);
+    merging it here means one dict allocation per record instead of an
+    intermediate merged copy plus this copy.
+    """
+    # Add metadata
+    record = {**base, **record_data} if base else record_data.copy()
+    record['record_id'] = record_id
+    record['created_by'] = username
+    record['created_at'] = datetime.utcnow().isoformat()
+    record['updated_at'] = datetime.utcnow().isoformat()
+    record['status'] = 'Active'
+
+    # Ensure requirement_round exists (calculate if not present)
+    if 'requirement_round' not in record or record.get('requirement_round') == 0:
+        record['requirement_round'] = get_requirement_round(
+            record.get('trial_id', ''),
+            record.get('type_of_requirement', '')
+        )
+
+    # Calculate defect density
+    record['defect_density'] = calculate_defect_density(
+        int(record.get('total_requirements', 0)),
+        int(record.get('total_failures', 0))
+    )
+
+    # Convert numeric fields
+    numeric_fields = ['no_of_rounds', 'current_round', 'requirement_round',
+                     'total_requirements', 'total_failures',
+                     'spec_issue', 'mock_crf_issue', 'programming_issue', 'scripting_issue']
+    for field in numeric_fields:
+        if field in record:
+            try:
+                record[field] = int(record[field])
+            except:
+                if field == 'requirement_round':
+                    record[field] = 1
+                else:
+                    record[field] = 0
+
+    # Validation
+    if int(record.get('total_failures', 0)) > int(record.get('total_requirements', 0)):
+        return None, "Total failures cannot exceed total requirements"
+
+    failure_sum = (record.get('spec_issue', 0) + record.get('mock_crf_issue', 0) +
+                  record.get('programming_issue', 0) + record.get('scripting_issue', 0))
+    if failure_sum > record.get('total_failures', 0):
+        return None, f"Sum of failure reasons ({failure_sum}) cannot exceed total failures"
+
+    return record, ""
+
+def get_max_requirement_round(trial_id: str, requirement_type: str) -> int:
+    """Highest persisted requirement round for a trial/type (0 if none)
+
+    Used to seed the wizard's per-type round counter once; subsequent
+    adds increment the counter instead of rescanning anything.
+    """
+    return max((r.get('requirement_round', 0) for r in _load_records()
+                if r.get('trial_id') == trial_id
+                and r.get('type_of_requirement') == requirement_type), default=0)
+
 def create_record(record_data: dict, username: str) -> Tuple[bool, str]:
     """Create new quality record with auto requirement round"""
     try:
         records = _load_records()
-        
-        # Add metadata
-        record = record_data.copy()
-        record['record_id'] = generate_record_id()
-        record['created_by'] = username
-        record['created_at'] = datetime.utcnow().isoformat()
-        record['updated_at'] = datetime.utcnow().isoformat()
-        record['status'] = 'Active'
-        
-        # Ensure requirement_round exists (calculate if not present)
-        if 'requirement_round' not in record or record.get('requirement_round') == 0:
-            record['requirement_round'] = get_requirement_round(
-                record.get('trial_id', ''),
-                record.get('type_of_requirement', '')
-            )
-        
-        # Calculate defect density
-        record['defect_density'] = calculate_defect_density(
-            int(record.get('total_requirements', 0)),
-            int(record.get('total_failures', 0))
-        )
-        
-        # Convert numeric fields
-        numeric_fields = ['no_of_rounds', 'current_round', 'requirement_round', 
-                         'total_requirements', 'total_failures',
-                         'spec_issue', 'mock_crf_issue', 'programming_issue', 'scripting_issue']
-        for field in numeric_fields:
-            if field in record:
-                try:
-                    record[field] = int(record[field])
-                except:
-                    if field == 'requirement_round':
-                        record[field] = 1
-                    else:
-                        record[field] = 0
-        
-        # Validation
-        if int(record.get('total_failures', 0)) > int(record.get('total_requirements', 0)):
-            return False, "Total failures cannot exceed total requirements"
-        
-        failure_sum = (record.get('spec_issue', 0) + record.get('mock_crf_issue', 0) + 
-                      record.get('programming_issue', 0) + record.get('scripting_issue', 0))
-        if failure_sum > record.get('total_failures', 0):
-            return False, f"Sum of failure reasons ({failure_sum}) cannot exceed total failures"
-        
+        record_id = f"QM{_next_record_number(records):03d}"
+        record, error = _build_record(record_data, username, record_id)
+        if record is None:
+            return False, error
+
         records.append(record)
-        
+
         if _save_records(records):
+            _invalidate_query_cache()
             return True, f"Quality record {record['record_id']} created successfully"
         return False, "Failed to save record"
-        
+
     except Exception as e:
         return False, f"Error creating record: {e}"
 
-def get_all_records() -> List[Dict]:
-    """Get all quality records"""
-    return _load_records()
+def bulk_create_records(records_data: List[Dict], username: str,
+                        base: Optional[Dict] = None) -> Tuple[int, List[str]]:
+    """Create many quality records with one load/validate/save cycle
+
+    Replaces N create_record calls - and therefore N full file rewrites -
+    with a single read and a single write for the whole batch. Invalid
+    rows are reported in the error list without blocking the valid ones;
+    a failed save leaves the table untouched.
+
+    Returns:
+        (saved_count, error_messages)
+    """
+    try:
+        records = _load_records()
+        next_number = _next_record_number(records)
+
+        prepared = []
+        errors = []
+        for record_data in records_data:
+            record_id = f"QM{next_number + len(prepared):03d}"
+            record, error = _build_record(record_data, username, record_id, base)
+            if record is None:
+                errors.append(error)
+            else:
+                prepared.append(record)
+
+        if not prepared:
+            return 0, errors
+
+        if _save_records(records + prepared):
+            _invalidate_query_cache()
+            return len(prepared), errors
+        return 0, errors + ["Failed to save records"]
+
+    except Exception as e:
+        return 0, [f"Error creating records: {e}"]
+
+def _table_version() -> int:
+    """Cheap version token for the quality table (file mtime in ns)
+
+    Stands in for the MAX(updated_at) + COUNT(*) aggregate a SQL store
+    would use: every write rewrites the file, so any change bumps the
+    token and old cache entries simply stop being requested.
+    """
+    try:
+        return QUALITY_FILE.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+def get_table_version() -> int:
+    """Public version token, used by the API's conditional responses"""
+    return _table_version()
+
+def _filters_key(filters: Optional[Dict]) -> Optional[tuple]:
+    """Normalize a filters dict into a hashable, order-independent cache key"""
+    if not filters:
+        return None
+    return tuple(sorted(filters.items()))
+
+def _invalidate_query_cache():
+    """Drop memoized query results after a write
+
+    The table only changes through create/update/delete, so cached reads
+    stay valid until one of those runs.
+    """
+    try:
+        cache.delete_memoized(_query_records_cached)
+        cache.delete_memoized(_get_statistics_cached)
+        cache.delete_memoized(_dashboard_bundle_cached)
+    except Exception as e:
+        print(f"Error invalidating quality cache: {e}")
+
+def _apply_filters(records: List[Dict], filters: Dict) -> List[Dict]:
+    """Filter records in a single pass, matching every key at once
+
+    Values are compared as strings because that is how the UI sends them
+    (query parameters), while stored fields may be ints.
+    """
+    filters_str = {key: str(value) for key, value in filters.items()}
+    return [r for r in records
+            if all(str(r.get(key)) == value for key, value in filters_str.items())]
+
+# Per-column record buckets for hot filter columns, keyed by table version.
+# A filtered query starts from the smallest matching bucket instead of the
+# whole table, then the remaining keys are checked on that subset only.
+_HOT_COLUMNS = ('trial_id', 'phase', 'type_of_requirement', 'created_by')
+_column_index: Optional[Tuple[int, Dict[str, Dict[str, List[Dict]]]]] = None
+
+def _get_column_index() -> Dict[str, Dict[str, List[Dict]]]:
+    global _column_index
+    version = _table_version()
+    if _column_index is None or _column_index[0] != version:
+        index = {column: {} for column in _HOT_COLUMNS}
+        for record in _load_records():
+            for column in _HOT_COLUMNS:
+                value = record.get(column)
+                if value is not None:
+                    index[column].setdefault(str(value), []).append(record)
+        _column_index = (version, index)
+    return _column_index[1]
+
+@cache.memoize(timeout=300)
+def _query_records_cached(filters_key: Optional[tuple]) -> List[Dict]:
+    """Memoized filtered read - invalidated by _invalidate_query_cache on writes"""
+    if not filters_key:
+        return _load_records()
+
+    filters = dict(filters_key)
+    index = _get_column_index()
+    seed = None
+    for key, value in filters.items():
+        if key in index:
+            bucket = index[key].get(str(value), [])
+            if seed is None or len(bucket) < len(seed):
+                seed = bucket
+    if seed is None:
+        seed = _load_records()
+    # _apply_filters re-tests every key, so seeding from a bucket is safe
+    return _apply_filters(seed, filters)
+
+def get_all_records(filters: Optional[Dict] = None) -> List[Dict]:
+    """Get all quality records, optionally filtered in the data layer"""
+    return _query_records_cached(_filters_key(filters))
+
+# record_id -> record map, keyed by table version; rebuilt lazily after writes
+_record_index: Optional[Tuple[int, Dict[str, Dict]]] = None
+
+def _get_record_index() -> Dict[str, Dict]:
+    global _record_index
+    version = _table_version()
+    if _record_index is None or _record_index[0] != version:
+        _record_index = (version, {r.get('record_id'): r for r in _load_records()})
+    return _record_index[1]
 
 def get_record_by_id(record_id: str) -> Optional[Dict]:
-    """Get record by ID"""
-    records = _load_records()
-    for record in records:
-        if record.get('record_id') == record_id:
-            return record
-    return None
+    """Get record by ID (O(1) lookup in a version-keyed index)"""
+    return _get_record_index().get(record_id)
 
-def get_records_by_user(username: str) -> List[Dict]:
-    """Get records created by user"""
-    records = _load_records()
-    return [r for r in records if r.get('created_by') == username]
+def get_records_by_user(username: str, filters: Optional[Dict] = None) -> List[Dict]:
+    """Get records created by user, optionally filtered in the data layer"""
+    # created_by is just another predicate - fold it in so the list is
+    # scanned once regardless of how many filters are active
+    combined = {'created_by': username}
+    if filters:
+        combined.update(filters)
+    return _query_records_cached(_filters_key(combined))
+
+def get_recent_records_by_user(username: str, limit: int = 5) -> List[Dict]:
+    """Most recent records created by a user, newest first
+
+    heapq.nlargest keeps only `limit` candidates while streaming the
+    user's records, instead of sorting everything and slicing.
+    """
+    return heapq.nlargest(
+        limit,
+        (r for r in _load_records() if r.get('created_by') == username),
+        key=lambda r: r.get('created_at', '')
+    )
 
 def get_records_by_trial(trial_id: str) -> List[Dict]:
     """Get records for specific trial"""
@@ -190,8 +420,9 @@ def update_record(record_id: str, updates: dict, username: str) -> Tuple[bool, s
                 )
                 
                 records[i] = record
-                
+
                 if _save_records(records):
+                    _invalidate_query_cache()
                     return True, f"Record {record_id} updated successfully"
                 return False, "Failed to save record"
         
@@ -212,29 +443,58 @@ def delete_record(record_id: str, username: str) -> Tuple[bool, str]:
             return False, f"Record {record_id} not found"
         
         if _save_records(records):
+            _invalidate_query_cache()
             return True, f"Record {record_id} deleted successfully"
         return False, "Failed to delete record"
         
     except Exception as e:
         return False, f"Error deleting record: {e}"
 
-def get_unique_values(field: str) -> List[str]:
-    """Get unique values for a field (for filters)"""
+@lru_cache(maxsize=64)
+def _unique_values_cached(field: str, version: int) -> tuple:
+    """Distinct values for a field at a given table version"""
     records = _load_records()
     values = set(str(r.get(field)) for r in records if field in r and r.get(field) is not None)
-    return sorted(list(values))
+    return tuple(sorted(values))
+
+def get_unique_values(field: str) -> List[str]:
+    """Get unique values for a field (for filters)
+
+    Memoized per (field, table version) - writes bump the version token,
+    so hits are near-perfect without an explicit invalidation hook.
+    """
+    return list(_unique_values_cached(field, _table_version()))
+
+# "Materialized" unfiltered summary, keyed by table version. The cumulative
+# per-round totals cannot be maintained with additive deltas on each write
+# (a new round changes how earlier rounds contribute), so the summary is
+# rebuilt lazily on the first read after a write instead of upserted.
+_summary_cache: Optional[Tuple[int, Dict]] = None
+
+def get_quality_summary() -> Dict:
+    """Precomputed statistics over the whole table - the common dashboard load"""
+    global _summary_cache
+    version = _table_version()
+    if _summary_cache is None or _summary_cache[0] != version:
+        _summary_cache = (version, _summarize(_load_records()))
+    return _summary_cache[1]
 
 def get_statistics(filters: Optional[Dict] = None) -> Dict:
     """Get statistics for dashboard with proper cumulative calculations"""
-    all_records = _load_records()
-    
-    # Apply filters
-    filtered_records = all_records
-    if filters:
-        for key, value in filters.items():
-            if value and value != "All":
-                filtered_records = [r for r in filtered_records if str(r.get(key)) == str(value)]
-    
+    active = {key: value for key, value in (filters or {}).items() if value and value != "All"}
+    if not active:
+        return get_quality_summary()
+    return _get_statistics_cached(_filters_key(active))
+
+@cache.memoize(timeout=300)
+def _get_statistics_cached(filters_key: Optional[tuple]) -> Dict:
+    records = _load_records()
+    if filters_key:
+        records = _apply_filters(records, dict(filters_key))
+    return _summarize(records)
+
+def _summarize(filtered_records: List[Dict]) -> Dict:
+    """Compute the dashboard statistics dict for an already-filtered record list"""
     if not filtered_records:
         return {
             'total_records': 0,
@@ -293,21 +553,20 @@ def get_statistics(filters: Optional[Dict] = None) -> Dict:
     # Calculate average defect density
     avg_defect_density = sum(r.get('defect_density', 0) for r in latest_records) / len(latest_records) if latest_records else 0
     
-    # Failure reasons (cumulative)
-    failure_reasons = {
-        'Spec Issue': sum(r.get('spec_issue', 0) for r in filtered_records),
-        'Mock CRF Issue': sum(r.get('mock_crf_issue', 0) for r in filtered_records),
-        'Programming Issue': sum(r.get('programming_issue', 0) for r in filtered_records),
-        'Scripting Issue': sum(r.get('scripting_issue', 0) for r in filtered_records)
-    }
-    
-    # Breakdowns
+    # Failure reasons (cumulative) and breakdowns, accumulated in one pass
+    # instead of four sum() scans plus a separate breakdown loop
+    spec_sum = mock_crf_sum = programming_sum = scripting_sum = 0
     type_breakdown = {}
     phase_breakdown = {}
     round_breakdown = {}
     requirement_round_breakdown = {}
-    
+
     for record in filtered_records:
+        spec_sum += record.get('spec_issue', 0)
+        mock_crf_sum += record.get('mock_crf_issue', 0)
+        programming_sum += record.get('programming_issue', 0)
+        scripting_sum += record.get('scripting_issue', 0)
+
         req_type = record.get('type_of_requirement', 'Unknown')
         type_breakdown[req_type] = type_breakdown.get(req_type, 0) + 1
         
@@ -319,7 +578,14 @@ def get_statistics(filters: Optional[Dict] = None) -> Dict:
         
         req_round = f"{req_type} R{record.get('requirement_round', 0)}"
         requirement_round_breakdown[req_round] = requirement_round_breakdown.get(req_round, 0) + 1
-    
+
+    failure_reasons = {
+        'Spec Issue': spec_sum,
+        'Mock CRF Issue': mock_crf_sum,
+        'Programming Issue': programming_sum,
+        'Scripting Issue': scripting_sum
+    }
+
     return {
         'total_records': len(filtered_records),
         'unique_trials': len(trials_data),
@@ -333,6 +599,58 @@ def get_statistics(filters: Optional[Dict] = None) -> Dict:
         'requirement_round_breakdown': requirement_round_breakdown
     }
 
+def get_dashboard_bundle(filters: Optional[Dict] = None, username: str = '',
+                         role: str = 'user', include_stats: bool = True,
+                         include_options: bool = True) -> Dict:
+    """Build everything the dashboard/list pages need in one scan of the table
+
+    Replaces the separate get_statistics + 4x get_unique_values +
+    get_all_records/get_records_by_user calls (five passes over the same
+    records) with a single loop that collects the distinct filter options,
+    the filter-matched records, and the role-visible rows together.
+    Statistics are computed over all filter-matched records (not
+    role-scoped), matching what the dashboard showed before.
+
+    Returns:
+        {stats, trial_ids, phases, types, rounds, records}
+    """
+    return _dashboard_bundle_cached(_filters_key(filters), username, role,
+                                    include_stats, include_options)
+
+@cache.memoize(timeout=300)
+def _dashboard_bundle_cached(filters_key: Optional[tuple], username: str,
+                             role: str, include_stats: bool,
+                             include_options: bool) -> Dict:
+    records = _load_records()
+    filters_str = {key: str(value) for key, value in (filters_key or ())}
+    user_only = role == 'user'
+
+    option_fields = ('trial_id', 'phase', 'type_of_requirement', 'current_round')
+    options = {field: set() for field in option_fields}
+    matched = []
+    visible = []
+
+    for record in records:
+        if include_options:
+            for field in option_fields:
+                value = record.get(field)
+                if value is not None:
+                    options[field].add(str(value))
+
+        if all(str(record.get(key)) == value for key, value in filters_str.items()):
+            matched.append(record)
+            if not user_only or record.get('created_by') == username:
+                visible.append(record)
+
+    return {
+        'stats': _summarize(matched) if include_stats else None,
+        'trial_ids': sorted(options['trial_id']),
+        'phases': sorted(options['phase']),
+        'types': sorted(options['type_of_requirement']),
+        'rounds': sorted(options['current_round']),
+        'records': visible
+    }
+
 # Class-based API for backward compatibility
 class QualityService:
     """Service class for quality operations"""
@@ -350,14 +668,14 @@ class QualityService:
         success, message = create_record(record_data, username)
         return success, message, None
     
-    def get_all_records(self):
-        return get_all_records()
-    
+    def get_all_records(self, filters: Optional[Dict] = None):
+        return get_all_records(filters)
+
     def get_record_by_id(self, record_id: str):
         return get_record_by_id(record_id)
-    
-    def get_records_by_user(self, username: str):
-        return get_records_by_user(username)
+
+    def get_records_by_user(self, username: str, filters: Optional[Dict] = None):
+        return get_records_by_user(username, filters)
     
     def get_records_by_trial(self, trial_id: str):
         return get_records_by_trial(trial_id)
@@ -3,11 +3,44 @@ UAT Service - Business logic for UAT records
 Flask version - Converted from Streamlit
 """
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 import json
 import os
 from config import UAT_RECORDS_FILE, AUDIT_LOGS_FILE
 
+def _table_version() -> int:
+    """Version token for the UAT records file
+
+    The file is rewritten on every create/update/delete, so its mtime
+    moves whenever the data changes - cheap to check and safe to key
+    caches on.
+    """
+    try:
+        return os.stat(UAT_RECORDS_FILE).st_mtime_ns
+    except OSError:
+        return 0
+
+def get_table_version() -> int:
+    """Public version token - changes whenever the records file does"""
+    return _table_version()
+
+# (version, parsed records) - shared by the read paths
+_records_cache: Optional[Tuple[int, List[Dict]]] = None
+
+def _get_records_cached() -> List[Dict]:
+    """Parsed records for the current file version
+
+    Read paths share one json.load per file change instead of re-parsing
+    uat_records.json on every call. Write paths load fresh copies so a
+    failed save cannot leave stale data in the cache.
+    """
+    global _records_cache
+    version = _table_version()
+    if _records_cache is None or _records_cache[0] != version:
+        _records_cache = (version, _load_uat_records())
+    return _records_cache[1]
+
 def _load_uat_records() -> List[Dict]:
     """Load UAT records from JSON file"""
     try:
@@ -90,20 +123,75 @@ def create_uat_record(uat_data: Dict, username: str) -> Tuple[bool, str]:
 
 def get_uat_records_by_role(role: str, username: str) -> List[Dict]:
     """Get UAT records based on user role"""
-    records = _load_uat_records()
-    
+    records = _get_records_cached()
+
     if role in ['superuser', 'admin', 'manager']:
         return records
     else:
         return [r for r in records if r.get('created_by') == username]
 
+# Columns the list page filters on - indexed per file version
+_FILTER_COLUMNS = ('trial_id', 'status', 'result', 'category_type')
+
+# (version, {field: {value: [records]}})
+_column_buckets: Optional[Tuple[int, Dict[str, Dict[str, List[Dict]]]]] = None
+
+def _get_column_buckets() -> Dict[str, Dict[str, List[Dict]]]:
+    """Secondary indexes over the filterable columns
+
+    One pass over the table buckets records by each filter column's
+    value; rebuilt lazily when the file version changes. Buckets keep
+    file order so filtered results render in the same order as
+    unfiltered ones.
+    """
+    global _column_buckets
+    version = _table_version()
+    if _column_buckets is None or _column_buckets[0] != version:
+        buckets = {field: {} for field in _FILTER_COLUMNS}
+        for record in _get_records_cached():
+            for field in _FILTER_COLUMNS:
+                value = record.get(field)
+                if value is not None:
+                    buckets[field].setdefault(value, []).append(record)
+        _column_buckets = (version, buckets)
+    return _column_buckets[1]
+
+def get_uat_records_filtered(role: str, username: str, filters: Optional[Dict] = None) -> List[Dict]:
+    """Role-scoped records matching equality filters on indexed columns
+
+    Seeds the scan from the smallest index bucket among the active
+    filters, so the remaining work is proportional to the candidate
+    set instead of the whole table.
+    """
+    active = {field: value for field, value in (filters or {}).items()
+              if field in _FILTER_COLUMNS}
+    if not active:
+        return get_uat_records_by_role(role, username)
+
+    buckets = _get_column_buckets()
+    seed_field = min(active, key=lambda field: len(buckets[field].get(active[field], [])))
+    candidates = buckets[seed_field].get(active[seed_field], [])
+    remaining = [(field, value) for field, value in active.items() if field != seed_field]
+    see_all = role in ['superuser', 'admin', 'manager']
+
+    return [r for r in candidates
+            if (see_all or r.get('created_by') == username)
+            and all(r.get(field) == value for field, value in remaining)]
+
+# (version, {record_id: record}) - primary-key lookup without a scan
+_record_index: Optional[Tuple[int, Dict[str, Dict]]] = None
+
+def _get_record_index() -> Dict[str, Dict]:
+    """id -> record map over the cached parse, rebuilt per file version"""
+    global _record_index
+    version = _table_version()
+    if _record_index is None or _record_index[0] != version:
+        _record_index = (version, {r.get('id'): r for r in _get_records_cached()})
+    return _record_index[1]
+
 def get_uat_record_by_id(record_id: str) -> Optional[Dict]:
     """Get single UAT record by ID"""
-    records = _load_uat_records()
-    for record in records:
-        if record.get('id') == record_id:
-            return record
-    return None
+    return _get_record_index().get(record_id)
 
 def update_uat_record(record_id: str, uat_data: Dict, username: str) -> Tuple[bool, str]:
     """Update UAT record"""
@@ -209,12 +297,28 @@ def get_uat_statistics(records: List[Dict]) -> Dict:
     
     return stats
 
-def get_trial_ids() -> List[str]:
-    """Get unique trial IDs"""
-    records = _load_uat_records()
+@lru_cache(maxsize=32)
+def _statistics_cached(role: str, username: str, version: int) -> Dict:
+    """Role-scoped statistics keyed by file version"""
+    return get_uat_statistics(get_uat_records_by_role(role, username))
+
+def get_uat_statistics_by_role(role: str, username: str) -> Dict:
+    """Get statistics over the records visible to this user
+
+    Cached per (role, username) until the records file changes, so
+    dashboard and list pages do not recount on every request.
+    """
+    return _statistics_cached(role, username, _table_version())
+
+@lru_cache(maxsize=8)
+def _trial_ids_cached(version: int) -> Tuple[str, ...]:
     trial_ids = []
-    for r in records:
+    for r in _get_records_cached():
         trial_id = r.get('trial_id')
         if trial_id and trial_id not in trial_ids:
             trial_ids.append(trial_id)
-    return sorted(trial_ids)
\ No newline at end of file
+    return tuple(sorted(trial_ids))
+
+def get_trial_ids() -> List[str]:
+    """Get unique trial IDs"""
+    return list(_trial_ids_cached(_table_version()))
\ No newline at end of file
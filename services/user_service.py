@@ -4,10 +4,12 @@ Handles all user-related business logic using JSON file storage
 Compatible with Streamlit's user data structure (username as key)
 """
 import json
+import time
+from functools import wraps
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Tuple, List
-from utils.auth import hash_password
+from utils.auth import hash_password, verify_password
 
 # Data file paths
 DATA_DIR = Path(__file__).resolve().parents[1] / 'data'
@@ -15,6 +17,84 @@ USERS_FILE = DATA_DIR / 'users.json'
 PENDING_USERS_FILE = DATA_DIR / 'pending_users.json'
 PASSWORD_RESET_FILE = DATA_DIR / 'password_reset_requests.json'
 
+# Read caches registered by @_ttl_cache, cleared whenever a store is saved
+_READ_CACHES = []
+
+# Parsed-file cache keyed by file name, validated against the file's mtime.
+# Re-parsing users.json on every request is the dominant cost of the JSON
+# store; with this cache a parse only happens when the file actually changed
+# (including edits made by the backup/restore scripts or another worker).
+_PARSED_FILES: Dict[str, Tuple[float, object]] = {}
+
+def _get_parsed(path: Path):
+    """Return (cached data, current mtime) if the cache is still valid"""
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None, None
+
+    entry = _PARSED_FILES.get(path.name)
+    if entry and entry[0] == mtime:
+        return entry[1], mtime
+    return None, mtime
+
+def _store_parsed(path: Path, data, mtime: Optional[float] = None):
+    """Record freshly parsed (or freshly saved) file contents"""
+    try:
+        if mtime is None:
+            mtime = path.stat().st_mtime
+        _PARSED_FILES[path.name] = (mtime, data)
+    except OSError:
+        _PARSED_FILES.pop(path.name, None)
+
+def _drop_parsed(path: Path):
+    """Forget cached contents (e.g. after a failed save)"""
+    _PARSED_FILES.pop(path.name, None)
+
+def _ttl_cache(seconds: int):
+    """Tiny TTL memoizer for read-only service functions
+
+    Admin panels call the same readers two or three times per navigation;
+    a short TTL collapses those into one file read. Every save path calls
+    _invalidate_read_caches() so stale windows only cover pure reads.
+    """
+    def decorator(fn):
+        cached = {}
+
+        @wraps(fn)
+        def wrapper(*args):
+            now = time.monotonic()
+            entry = cached.get(args)
+            if entry and now - entry[0] < seconds:
+                return entry[1]
+            result = fn(*args)
+            cached[args] = (now, result)
+            return result
+
+        wrapper.cache_clear = cached.clear
+        _READ_CACHES.append(cached)
+        return wrapper
+    return decorator
+
+def _invalidate_read_caches():
+    """Drop all memoized reads after a mutation"""
+    for cached in _READ_CACHES:
+        cached.clear()
+
+def get_store_version() -> str:
+    """Opaque version token for the user stores, derived from file mtimes
+
+    Changes whenever any of the three backing files is written (by this
+    process or externally), so it is safe to use in ETags.
+    """
+    parts = []
+    for path in (USERS_FILE, PENDING_USERS_FILE, PASSWORD_RESET_FILE):
+        try:
+            parts.append(str(path.stat().st_mtime_ns))
+        except OSError:
+            parts.append('0')
+    return '-'.join(parts)
+
 def _ensure_data_file():
     """Ensure data directory and users file exist"""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -46,6 +126,11 @@ def _load_users() -> Dict[str, Dict]:
     """Load all users from file"""
     try:
         _ensure_data_file()
+
+        cached, mtime = _get_parsed(USERS_FILE)
+        if cached is not None:
+            return cached
+
         with USERS_FILE.open('r', encoding='utf-8') as f:
             content = f.read().strip()
             if not content:
@@ -59,7 +144,8 @@ def _load_users() -> Dict[str, Dict]:
             if not isinstance(data, dict):
                 print(f"Error: users.json contains {type(data)}, expected dict")
                 return {}
-            
+
+            _store_parsed(USERS_FILE, data, mtime)
             return data
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON in users.json: {e}")
@@ -77,17 +163,27 @@ def _save_users(users: Dict[str, Dict]) -> bool:
         
         with USERS_FILE.open('w', encoding='utf-8') as f:
             json.dump(users, f, indent=4, ensure_ascii=False)
+        _store_parsed(USERS_FILE, users)
+        _invalidate_read_caches()
         return True
     except Exception as e:
         print(f"Error saving users: {e}")
+        _drop_parsed(USERS_FILE)
         return False
 
 def _load_pending_users() -> List[Dict]:
     """Load pending users"""
     try:
         _ensure_data_file()
+
+        cached, mtime = _get_parsed(PENDING_USERS_FILE)
+        if cached is not None:
+            return cached
+
         with PENDING_USERS_FILE.open('r', encoding='utf-8') as f:
-            return json.load(f)
+            data = json.load(f)
+        _store_parsed(PENDING_USERS_FILE, data, mtime)
+        return data
     except Exception as e:
         print(f"Error loading pending users: {e}")
         return []
@@ -97,17 +193,27 @@ def _save_pending_users(pending: List[Dict]) -> bool:
     try:
         with PENDING_USERS_FILE.open('w', encoding='utf-8') as f:
             json.dump(pending, f, indent=4, ensure_ascii=False)
+        _store_parsed(PENDING_USERS_FILE, pending)
+        _invalidate_read_caches()
         return True
     except Exception as e:
         print(f"Error saving pending users: {e}")
+        _drop_parsed(PENDING_USERS_FILE)
         return False
 
 def _load_password_resets() -> List[Dict]:
     """Load password reset requests"""
     try:
         _ensure_data_file()
+
+        cached, mtime = _get_parsed(PASSWORD_RESET_FILE)
+        if cached is not None:
+            return cached
+
         with PASSWORD_RESET_FILE.open('r', encoding='utf-8') as f:
-            return json.load(f)
+            data = json.load(f)
+        _store_parsed(PASSWORD_RESET_FILE, data, mtime)
+        return data
     except Exception as e:
         print(f"Error loading password resets: {e}")
         return []
@@ -117,9 +223,12 @@ def _save_password_resets(resets: List[Dict]) -> bool:
     try:
         with PASSWORD_RESET_FILE.open('w', encoding='utf-8') as f:
             json.dump(resets, f, indent=4, ensure_ascii=False)
+        _store_parsed(PASSWORD_RESET_FILE, resets)
+        _invalidate_read_caches()
         return True
     except Exception as e:
         print(f"Error saving password resets: {e}")
+        _drop_parsed(PASSWORD_RESET_FILE)
         return False
 
 # ============================================================================
@@ -140,18 +249,41 @@ def get_user_by_username(username: str) -> Optional[Dict]:
     
     return None
 
-def get_user_by_email(email: str) -> Optional[Dict]:
-    """Get user data by email"""
+# Lowercased email -> user index, rebuilt whenever users.json changes.
+# login/register/forgot-password and the AJAX availability checks all do
+# email lookups; this turns each one into a dict probe instead of a scan.
+_email_index: Optional[Tuple[float, Dict[str, Dict]]] = None
+
+
+def _get_email_index() -> Dict[str, Dict]:
+    """Get the email -> user index, rebuilt when the users file changes"""
+    global _email_index
+    try:
+        mtime = USERS_FILE.stat().st_mtime
+    except OSError:
+        mtime = 0.0
+
+    if _email_index and _email_index[0] == mtime:
+        return _email_index[1]
+
+    index = {}
     users = _load_users()
-    
-    if not isinstance(users, dict):
-        return None
-    
-    for username, user_data in users.items():
-        if isinstance(user_data, dict) and user_data.get('email', '').lower() == email.lower():
-            return user_data
-    
-    return None
+    if isinstance(users, dict):
+        for user_data in users.values():
+            if isinstance(user_data, dict):
+                # email_lc is stored at write time; lowercase only for
+                # records created before the field existed
+                email_lc = user_data.get('email_lc') or user_data.get('email', '').lower()
+                if email_lc:
+                    index[email_lc] = user_data
+
+    _email_index = (mtime, index)
+    return index
+
+
+def get_user_by_email(email: str) -> Optional[Dict]:
+    """Get user data by email (case-insensitive, indexed lookup)"""
+    return _get_email_index().get(email.lower())
 
 def authenticate_user(username: str, password: str) -> Optional[Dict]:
     """Authenticate user with username and password"""
@@ -165,10 +297,8 @@ def authenticate_user(username: str, password: str) -> Optional[Dict]:
     if not isinstance(user, dict):
         return None
     
-    hashed_input = hash_password(password)
-    stored_hash = user.get('password', '')
-    
-    if stored_hash != hashed_input:
+    # Exactly one hash verification per login attempt
+    if not verify_password(password, user.get('password', '')):
         return None
     
     is_active = user.get('is_active', True)
@@ -187,6 +317,7 @@ def authenticate_user(username: str, password: str) -> Optional[Dict]:
     
     return user_copy
 
+@_ttl_cache(10)
 def get_all_users() -> Dict[str, Dict]:
     """Get all users (without passwords)"""
     users = _load_users()
@@ -204,6 +335,36 @@ def get_all_users() -> Dict[str, Dict]:
     
     return result
 
+def iter_all_users():
+    """Yield users (without passwords) one at a time
+
+    Generator counterpart of get_all_users() for consumers that stream
+    records out and never need the full dict in memory.
+    """
+    users = _load_users()
+
+    if not isinstance(users, dict):
+        return
+
+    for username, user_data in users.items():
+        if isinstance(user_data, dict):
+            user_copy = user_data.copy()
+            user_copy.pop('password', None)
+            user_copy['username'] = username
+            yield user_copy
+
+def get_users_by_role() -> Dict[str, Dict[str, Dict]]:
+    """Get all users (without passwords) bucketed by role in a single pass
+
+    Returns:
+        Dict mapping role -> {username: user_data}, e.g. buckets.get('user', {})
+    """
+    buckets = {}
+    for username, user_copy in get_all_users().items():
+        role = user_copy.get('role', 'user')
+        buckets.setdefault(role, {})[username] = user_copy
+    return buckets
+
 def create_user(username: str, email: str, password: str, role: str = "user", created_by: Optional[str] = None) -> Tuple[bool, str]:
     """Create new user"""
     try:
@@ -215,6 +376,7 @@ def create_user(username: str, email: str, password: str, role: str = "user", cr
         new_user = {
             'password': hash_password(password),
             'email': email,
+            'email_lc': email.lower(),
             'role': role,
             'status': 'active',
             'is_active': True,
@@ -283,10 +445,48 @@ def delete_user(username: str) -> Tuple[bool, str]:
 # PENDING USER MANAGEMENT
 # ============================================================================
 
+@_ttl_cache(10)
 def get_pending_users() -> List[Dict]:
     """Get all pending user registrations"""
     return _load_pending_users()
 
+# Pending-user indexes rebuilt whenever pending_users.json changes. The
+# registration form's per-keystroke availability checks hit these, so
+# membership tests must be dict probes rather than list scans.
+_pending_index: Optional[Tuple[float, Dict[str, Dict], Dict[str, Dict]]] = None
+
+
+def get_pending_user_indexes() -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """Get (username -> record, lowercased email -> record) for pending users"""
+    global _pending_index
+    try:
+        mtime = PENDING_USERS_FILE.stat().st_mtime
+    except OSError:
+        mtime = 0.0
+
+    if _pending_index and _pending_index[0] == mtime:
+        return _pending_index[1], _pending_index[2]
+
+    by_username = {}
+    by_email = {}
+    for pending in _load_pending_users():
+        username = pending.get('username')
+        if username:
+            by_username[username] = pending
+        email_lc = pending.get('email_lc') or pending.get('email', '').lower()
+        if email_lc:
+            by_email[email_lc] = pending
+
+    _pending_index = (mtime, by_username, by_email)
+    return by_username, by_email
+
+
+def add_pending_user(pending_user: Dict) -> bool:
+    """Append one registration to the pending users store"""
+    pending_users = _load_pending_users()
+    pending_users.append(pending_user)
+    return _save_pending_users(pending_users)
+
 def approve_pending_user(username: str, approved_role: str, approved_by: Optional[str] = None) -> Tuple[bool, str]:
     """Approve pending user registration"""
     try:
@@ -305,6 +505,7 @@ def approve_pending_user(username: str, approved_role: str, approved_by: Optiona
         users[username] = {
             "password": pending_user['password'],
             "email": pending_user['email'],
+            "email_lc": pending_user.get('email_lc') or pending_user['email'].lower(),
             "role": approved_role,
             "status": "active",
             "is_active": True,
@@ -326,6 +527,70 @@ def approve_pending_user(username: str, approved_role: str, approved_by: Optiona
     except Exception as e:
         return False, f"Error: {str(e)}"
 
+def approve_pending_users_bulk(usernames: List[str], approved_role: str, approved_by: Optional[str] = None) -> Tuple[bool, str]:
+    """Approve several pending registrations with a single store read/write
+
+    Approving N users one-by-one rewrites the users file N times; this
+    loads it once, moves every matching pending user across, and saves once.
+    """
+    try:
+        requested = set(usernames)
+        pending_users = _load_pending_users()
+        users = _load_users()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        approved = set()
+        for pending_user in pending_users:
+            username = pending_user.get('username')
+            if username not in requested:
+                continue
+
+            users[username] = {
+                "password": pending_user['password'],
+                "email": pending_user['email'],
+                "email_lc": pending_user.get('email_lc') or pending_user['email'].lower(),
+                "role": approved_role,
+                "status": "active",
+                "is_active": True,
+                "created_at": now,
+                "approved_by": approved_by if approved_by else 'admin',
+                "is_audit_reviewer": False,
+                "audit_reviewer_requested": pending_user.get('audit_reviewer_requested', False),
+                "audit_reviewer_justification": pending_user.get('audit_reviewer_justification'),
+                "audit_reviewer_approved_by": None,
+                "audit_reviewer_approved_at": None
+            }
+            approved.add(username)
+
+        if not approved:
+            return False, "No matching pending users found"
+
+        if _save_users(users):
+            remaining = [u for u in pending_users if u.get('username') not in approved]
+            _save_pending_users(remaining)
+            return True, f"Approved {len(approved)} user(s) as {approved_role}"
+
+        return False, "Failed to approve users"
+    except Exception as e:
+        return False, f"Error: {str(e)}"
+
+def reject_pending_users_bulk(usernames: List[str]) -> Tuple[bool, str]:
+    """Reject several pending registrations with a single store read/write"""
+    try:
+        requested = set(usernames)
+        pending_users = _load_pending_users()
+        remaining = [u for u in pending_users if u.get('username') not in requested]
+
+        rejected = len(pending_users) - len(remaining)
+        if rejected == 0:
+            return False, "No matching pending users found"
+
+        if _save_pending_users(remaining):
+            return True, f"Rejected {rejected} registration(s)"
+        return False, "Failed to reject users"
+    except Exception as e:
+        return False, f"Error: {str(e)}"
+
 def reject_pending_user(username: str) -> Tuple[bool, str]:
     """Reject pending user registration"""
     try:
@@ -393,6 +658,42 @@ def approve_password_reset(request_id: str, approved_by: Optional[str] = None) -
     except Exception as e:
         return False, f"Error: {str(e)}"
 
+def approve_password_resets_bulk(request_ids: List[str], approved_by: Optional[str] = None) -> Tuple[bool, str]:
+    """Approve several password reset requests with one read/write per file"""
+    try:
+        requested = set(request_ids)
+        reset_requests = _load_password_resets()
+        users = _load_users()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        actor = approved_by if approved_by else 'admin'
+
+        approved = 0
+        for req in reset_requests:
+            if req.get('id') not in requested or req.get('status') != 'pending':
+                continue
+
+            username = req.get('username')
+            if username not in users:
+                continue
+
+            users[username]['password'] = req.get('new_password')
+            users[username]['password_reset_by'] = actor
+            users[username]['password_reset_at'] = now
+
+            req['status'] = 'approved'
+            req['approved_by'] = actor
+            req['approved_at'] = now
+            approved += 1
+
+        if not approved:
+            return False, "No matching pending reset requests found"
+
+        if _save_users(users) and _save_password_resets(reset_requests):
+            return True, f"Approved {approved} password reset(s)"
+        return False, "Failed to update passwords"
+    except Exception as e:
+        return False, f"Error: {str(e)}"
+
 def reject_password_reset(request_id: str, rejected_by: Optional[str] = None) -> Tuple[bool, str]:
     """Reject password reset request"""
     try:
@@ -480,6 +781,37 @@ def approve_audit_reviewer(username: str, approved_by: Optional[str] = None) ->
     except Exception as e:
         return False, f"Error: {str(e)}"
 
+def approve_audit_reviewers_bulk(usernames: List[str], approved_by: Optional[str] = None) -> Tuple[bool, str]:
+    """Approve audit reviewer access for several users with one read/write"""
+    try:
+        requested = set(usernames)
+        users = _load_users()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        actor = approved_by if approved_by else 'admin'
+
+        approved = 0
+        for username in requested:
+            user = users.get(username)
+            if (not user or
+                    not user.get('audit_reviewer_requested', False) or
+                    user.get('is_audit_reviewer', False)):
+                continue
+
+            user['is_audit_reviewer'] = True
+            user['audit_reviewer_requested'] = False
+            user['audit_reviewer_approved_by'] = actor
+            user['audit_reviewer_approved_at'] = now
+            approved += 1
+
+        if not approved:
+            return False, "No matching reviewer requests found"
+
+        if _save_users(users):
+            return True, f"Audit Reviewer access granted to {approved} user(s)"
+        return False, "Failed to save changes"
+    except Exception as e:
+        return False, f"Error: {str(e)}"
+
 def reject_audit_reviewer(username: str) -> Tuple[bool, str]:
     """Reject audit reviewer access request"""
     try:
@@ -577,11 +909,8 @@ def request_audit_reviewer_access(username: str, justification: str) -> Tuple[bo
 # STATISTICS
 # ============================================================================
 
-def get_user_statistics() -> Dict:
-    """Get user statistics"""
-    users = _load_users()
-    pending = _load_pending_users()
-    
+def _build_statistics(users: Dict[str, Dict], pending: List[Dict]) -> Dict:
+    """Build user statistics from already-loaded data"""
     stats = {
         'total': len(users),
         'by_role': {},
@@ -590,23 +919,101 @@ def get_user_statistics() -> Dict:
         'audit_reviewers': 0,
         'pending_audit_reviewers': 0
     }
-    
+
     for user in users.values():
         role = user.get('role', 'unknown')
         status = user.get('status', 'active')
-        
+
         stats['by_role'][role] = stats['by_role'].get(role, 0) + 1
         stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
-        
+
         if user.get('is_audit_reviewer', False):
             stats['audit_reviewers'] += 1
-        
-        if (user.get('audit_reviewer_requested', False) and 
+
+        if (user.get('audit_reviewer_requested', False) and
             not user.get('is_audit_reviewer', False)):
             stats['pending_audit_reviewers'] += 1
-    
+
     return stats
 
+@_ttl_cache(10)
+def get_user_statistics() -> Dict:
+    """Get user statistics"""
+    users = _load_users()
+    pending = _load_pending_users()
+    return _build_statistics(users, pending)
+
+def get_superuser_dashboard_bundle(recent_resets_limit: int = 10) -> Dict:
+    """
+    Load everything the superuser panel needs in a single pass.
+
+    Reads the users, pending users and password reset files once each and
+    partitions the results in memory, instead of each view helper re-reading
+    the same files (7 reads per page load -> 3). Only the most recent
+    `recent_resets_limit` processed resets are returned since that is all
+    the panel displays.
+
+    Returns:
+        Dict with keys: all_users, pending_users, pending_reviewers,
+        audit_reviewers, pending_resets, processed_resets, stats
+    """
+    users = _load_users()
+    pending_users = _load_pending_users()
+    resets = _load_password_resets()
+
+    all_users = {}
+    audit_reviewers = []
+    pending_reviewers = []
+
+    for username, user_data in users.items():
+        if not isinstance(user_data, dict):
+            continue
+
+        user_copy = user_data.copy()
+        user_copy.pop('password', None)
+        user_copy['username'] = username
+        all_users[username] = user_copy
+
+        if user_data.get('is_audit_reviewer', False):
+            audit_reviewers.append({
+                'username': username,
+                'email': user_data.get('email'),
+                'role': user_data.get('role'),
+                'approved_by': user_data.get('audit_reviewer_approved_by'),
+                'approved_at': user_data.get('audit_reviewer_approved_at')
+            })
+        elif (user_data.get('status') == 'active' and
+              user_data.get('audit_reviewer_requested', False)):
+            pending_reviewers.append({
+                'username': username,
+                'email': user_data.get('email'),
+                'role': user_data.get('role'),
+                'audit_reviewer_justification': user_data.get('audit_reviewer_justification'),
+                'created_at': user_data.get('created_at'),
+                'approved_by': user_data.get('approved_by')
+            })
+
+    pending_resets = [r for r in resets if r.get('status') == 'pending']
+
+    # Walk the history backwards so cost stays bounded as it grows
+    processed_resets = []
+    for reset in reversed(resets):
+        if reset.get('status') != 'pending':
+            processed_resets.append(reset)
+            if len(processed_resets) >= recent_resets_limit:
+                break
+    processed_resets.reverse()  # back to chronological order
+
+    return {
+        'all_users': all_users,
+        'pending_users': pending_users,
+        'pending_reviewers': pending_reviewers,
+        'audit_reviewers': audit_reviewers,
+        'pending_resets': pending_resets,
+        'processed_resets': processed_resets,
+        'stats': _build_statistics(users, pending_users)
+    }
+
 def change_password(username: str, old_password: str, new_password: str) -> Tuple[bool, str]:
     """Change user password"""
     try:
@@ -617,7 +1024,7 @@ def change_password(username: str, old_password: str, new_password: str) -> Tupl
         
         user = users[username]
         
-        if hash_password(old_password) != user.get('password', ''):
+        if not verify_password(old_password, user.get('password', '')):
             return False, "Current password is incorrect"
         
         users[username]['password'] = hash_password(new_password)
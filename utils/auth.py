@@ -2,6 +2,7 @@
 Authentication utilities
 """
 import hashlib
+import hmac
 
 
 def hash_password(password: str) -> str:
@@ -10,8 +11,8 @@ def hash_password(password: str) -> str:
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    """Verify password against hash"""
-    return hash_password(password) == hashed_password
+    """Verify password against hash (constant-time comparison)"""
+    return hmac.compare_digest(hash_password(password), hashed_password)
 
 def get_current_user_flask(session_obj) -> str:
     """Get current logged-in user (Flask version)"""
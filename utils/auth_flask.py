@@ -52,13 +52,17 @@ def is_audit_reviewer() -> bool:
     """Check if current user has audit reviewer access"""
     return session.get('is_audit_reviewer', False) or is_superuser()
 
+# Role allowlists - built once at import, O(1) membership tests
+_MANAGE_USERS_ROLES = frozenset({'superuser', 'admin'})
+_VIEW_ALL_DATA_ROLES = frozenset({'superuser', 'admin', 'manager'})
+
 def can_manage_users() -> bool:
     """Check if user can manage other users"""
-    return get_current_role() in ['superuser', 'admin']
+    return get_current_role() in _MANAGE_USERS_ROLES
 
 def can_view_all_data() -> bool:
     """Check if user can view all data"""
-    return get_current_role() in ['superuser', 'admin', 'manager']
+    return get_current_role() in _VIEW_ALL_DATA_ROLES
 
 def login_user(username: str, role: str, is_audit_reviewer: bool = False):
     """Log in user and set session"""
@@ -85,6 +89,8 @@ def login_required(f):
 
 def role_required(*roles):
     """Decorator to require specific role(s)"""
+    role_set = frozenset(roles)
+
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -93,7 +99,7 @@ def role_required(*roles):
                 return redirect(url_for('auth.login'))
             
             user_role = get_current_role()
-            if user_role not in roles:
+            if user_role not in role_set:
                 flash(f'❌ Access Denied: This page requires {" or ".join(roles)} role', 'danger')
                 abort(403)
             
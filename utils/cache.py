@@ -0,0 +1,56 @@
+"""
+Application cache - Flask-Caching wrapper
+Used to cache read-only admin views between navigations.
+Falls back to a no-op cache if Flask-Caching is not installed.
+"""
+
+try:
+    from flask_caching import Cache
+    HAS_FLASK_CACHING = True
+
+    cache = Cache(config={
+        'CACHE_TYPE': 'SimpleCache',
+        'CACHE_DEFAULT_TIMEOUT': 30
+    })
+except ImportError:
+    HAS_FLASK_CACHING = False
+    print("⚠️  Flask-Caching not installed - view caching disabled")
+
+    class _NullCache:
+        """No-op stand-in so view code works without Flask-Caching"""
+
+        def init_app(self, app):
+            pass
+
+        def cached(self, *args, **kwargs):
+            def decorator(f):
+                return f
+            return decorator
+
+        def memoize(self, *args, **kwargs):
+            def decorator(f):
+                return f
+            return decorator
+
+        def delete(self, *args, **kwargs):
+            pass
+
+        def delete_memoized(self, *args, **kwargs):
+            pass
+
+        def clear(self):
+            pass
+
+    cache = _NullCache()
+
+def init_cache(app):
+    """Attach the cache to the Flask app"""
+    cache.init_app(app)
+    return HAS_FLASK_CACHING
+
+def invalidate_view_cache():
+    """Drop all cached views after a data mutation"""
+    try:
+        cache.clear()
+    except Exception as e:
+        print(f"Error clearing view cache: {e}")
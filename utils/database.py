@@ -203,25 +203,41 @@ def save_password_reset_requests(requests: List[Dict]) -> bool:
 # ============================================================================
 # EMAIL CONFIG FUNCTIONS
 # ============================================================================
+
+# Config rarely changes but is consulted on every registration/reset;
+# re-read only when the file's mtime moves.
+_email_config_cache: Optional[tuple] = None
+
 def load_email_config() -> Dict[str, Any]:
-    """Load email configuration"""
+    """Load email configuration (cached until the file changes)"""
+    global _email_config_cache
     try:
         _ensure_data_dir()
-        if EMAIL_CONFIG_FILE.exists():
-            with EMAIL_CONFIG_FILE.open('r', encoding='utf-8') as f:
-                return json.load(f)
-        return {"enabled": False}
+        if not EMAIL_CONFIG_FILE.exists():
+            return {"enabled": False}
+
+        mtime = EMAIL_CONFIG_FILE.stat().st_mtime
+        if _email_config_cache and _email_config_cache[0] == mtime:
+            return _email_config_cache[1]
+
+        with EMAIL_CONFIG_FILE.open('r', encoding='utf-8') as f:
+            config = json.load(f)
+        _email_config_cache = (mtime, config)
+        return config
     except Exception as e:
         print(f"Error loading email config: {e}")
         return {"enabled": False}
 
 def save_email_config(config: Dict[str, Any]) -> bool:
     """Save email configuration"""
+    global _email_config_cache
     try:
         _ensure_data_dir()
         with EMAIL_CONFIG_FILE.open('w', encoding='utf-8') as f:
             json.dump(config, f, indent=2, ensure_ascii=False)
+        _email_config_cache = (EMAIL_CONFIG_FILE.stat().st_mtime, config)
         return True
     except Exception as e:
         print(f"Error saving email config: {e}")
+        _email_config_cache = None
         return False
\ No newline at end of file
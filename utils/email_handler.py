@@ -2,6 +2,8 @@
 Email handler for sending notifications
 """
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Optional, List, Union
@@ -124,12 +126,13 @@ def send_email(
         print(f"❌ {error_msg}")
         print(f"Details: {str(e)}")
         return {'success': False, 'message': error_msg}
-        
-    except smtplib.SMTPException as e:
+
+    except (smtplib.SMTPException, OSError) as e:
+        # Transient server/network failures - background senders may retry
         error_msg = f"SMTP error occurred: {str(e)}"
         print(f"❌ {error_msg}")
-        return {'success': False, 'message': error_msg}
-        
+        return {'success': False, 'message': error_msg, 'transient': True}
+
     except Exception as e:
         error_msg = f"Error sending email: {str(e)}"
         print(f"❌ {error_msg}")
@@ -137,6 +140,50 @@ def send_email(
         return {'success': False, 'message': error_msg}
 
 
+def send_email_async(
+    to_email: Union[str, List[str]],
+    subject: str,
+    body_html: str,
+    from_email: Optional[str] = None,
+    cc_emails: Optional[List[str]] = None,
+    max_retries: int = 3
+) -> threading.Thread:
+    """
+    Send an email on a background thread
+
+    The SMTP handshake can take seconds; notification sends (registration,
+    password reset) should not hold the request worker for that. The body
+    is rendered by the caller on the request thread - only the network I/O
+    moves off it.
+
+    Transient SMTP/network failures are retried with exponential backoff
+    (1s, 2s, 4s) up to max_retries times; auth and configuration errors
+    are not retried. Failures are logged by send_email; callers that need
+    the result should use send_email directly.
+
+    Returns:
+        threading.Thread: the started sender thread (mainly for tests)
+    """
+    app = current_app._get_current_object()
+
+    def _send():
+        with app.app_context():
+            for attempt in range(max_retries + 1):
+                result = send_email(to_email, subject, body_html,
+                                    from_email=from_email, cc_emails=cc_emails)
+                if result['success'] or not result.get('transient'):
+                    return
+                if attempt < max_retries:
+                    delay = 2 ** attempt
+                    print(f"🔁 Retrying email send in {delay}s (attempt {attempt + 2}/{max_retries + 1})")
+                    time.sleep(delay)
+            print(f"❌ Giving up on email to {to_email} after {max_retries + 1} attempts")
+
+    thread = threading.Thread(target=_send, name='email-send', daemon=True)
+    thread.start()
+    return thread
+
+
 def create_uat_email_body(record: dict, action: str = "created", portal_url: str = "") -> str:
     """
     Create HTML email body for UAT record notification
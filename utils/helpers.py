@@ -19,7 +19,7 @@ def format_date(date_str: str, input_format: str = "%Y-%m-%d", output_format: st
     try:
         dt = datetime.strptime(date_str, input_format)
         return dt.strftime(output_format)
-    except:
+    except (TypeError, ValueError):
         return date_str
 
 def format_datetime(datetime_str: str, input_format: str = "%Y-%m-%d %H:%M:%S", output_format: str = "%d %b %Y %I:%M %p") -> str:
@@ -27,7 +27,7 @@ def format_datetime(datetime_str: str, input_format: str = "%Y-%m-%d %H:%M:%S",
     try:
         dt = datetime.strptime(datetime_str, input_format)
         return dt.strftime(output_format)
-    except:
+    except (TypeError, ValueError):
         return datetime_str
 
 def filter_records_by_user(records: List[Dict], username: str) -> List[Dict]:
@@ -77,7 +77,7 @@ def calculate_duration(start_date: str, end_date: str) -> int:
         start = datetime.strptime(start_date, "%Y-%m-%d")
         end = datetime.strptime(end_date, "%Y-%m-%d")
         return (end - start).days
-    except:
+    except (TypeError, ValueError):
         return 0
     
 # utils/helpers.py
@@ -117,7 +117,7 @@ def format_date(date_string: str, format_out: str = "%Y-%m-%d") -> str:
             date_obj = datetime.strptime(date_string, "%Y-%m-%d")
             return date_obj.strftime(format_out)
         return "N/A"
-    except:
+    except (TypeError, ValueError):
         return date_string
 
 def format_datetime(datetime_string: str, format_out: str = "%Y-%m-%d %H:%M:%S") -> str:
@@ -127,7 +127,7 @@ def format_datetime(datetime_string: str, format_out: str = "%Y-%m-%d %H:%M:%S")
             dt_obj = datetime.strptime(datetime_string, "%Y-%m-%d %H:%M:%S")
             return dt_obj.strftime(format_out)
         return "N/A"
-    except:
+    except (TypeError, ValueError):
         return datetime_string
 
 def truncate_text(text: str, max_length: int = 100) -> str:
@@ -152,7 +152,7 @@ def calculate_duration(start_date: str, end_date: str) -> int:
         start = datetime.strptime(start_date, "%Y-%m-%d")
         end = datetime.strptime(end_date, "%Y-%m-%d")
         return (end - start).days
-    except:
+    except (TypeError, ValueError):
         return 0
 
 def get_date_range_string(start_date: str, end_date: str) -> str:
@@ -161,7 +161,7 @@ def get_date_range_string(start_date: str, end_date: str) -> str:
         start = datetime.strptime(start_date, "%Y-%m-%d").strftime("%b %d, %Y")
         end = datetime.strptime(end_date, "%Y-%m-%d").strftime("%b %d, %Y")
         return f"{start} - {end}"
-    except:
+    except (TypeError, ValueError):
         return f"{start_date} - {end_date}"
 
 def is_date_in_past(date_string: str) -> bool:
@@ -169,7 +169,7 @@ def is_date_in_past(date_string: str) -> bool:
     try:
         date_obj = datetime.strptime(date_string, "%Y-%m-%d")
         return date_obj.date() < datetime.now().date()
-    except:
+    except (TypeError, ValueError):
         return False
 
 def is_date_in_future(date_string: str) -> bool:
@@ -177,7 +177,7 @@ def is_date_in_future(date_string: str) -> bool:
     try:
         date_obj = datetime.strptime(date_string, "%Y-%m-%d")
         return date_obj.date() > datetime.now().date()
-    except:
+    except (TypeError, ValueError):
         return False
 
 def get_relative_time(datetime_string: str) -> str:
@@ -202,7 +202,7 @@ def get_relative_time(datetime_string: str) -> str:
             return f"{days} day{'s' if days > 1 else ''} ago"
         else:
             return dt.strftime("%Y-%m-%d")
-    except:
+    except (TypeError, ValueError):
         return datetime_string
 
 def validate_email(email: str) -> bool:
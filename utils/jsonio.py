@@ -0,0 +1,31 @@
+# utils/jsonio.py
+"""
+JSON response helper - orjson-backed replacement for jsonify
+"""
+from flask import Response
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    HAS_ORJSON = True
+except ImportError:
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    HAS_ORJSON = False
+
+
+def ojsonify(obj) -> Response:
+    """Serialize to an application/json response
+
+    Drop-in replacement for jsonify on hot API endpoints: orjson
+    serializes lists of dicts several times faster than the stdlib
+    encoder and allocates far less. Falls back to stdlib json when
+    orjson is not installed.
+    """
+    return Response(_dumps(obj), mimetype='application/json')
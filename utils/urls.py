@@ -0,0 +1,26 @@
+"""
+URL helpers - memoized url_for
+Flask's url_for re-walks the URL map on every call; admin pages emit the
+same handful of endpoints dozens of times per render, so cache the results.
+"""
+from functools import lru_cache
+from flask import url_for
+
+@lru_cache(maxsize=4096)
+def _build_url(endpoint: str, items: tuple) -> str:
+    """Build and cache a URL for an endpoint + sorted kwargs tuple"""
+    return url_for(endpoint, **dict(items))
+
+def cached_url_for(endpoint: str, **values) -> str:
+    """Drop-in replacement for url_for with an LRU cache
+
+    Only safe for plain path-building (no _external/_scheme overrides,
+    which can vary per request) - fall back to url_for for those.
+    """
+    if any(key.startswith('_') for key in values):
+        return url_for(endpoint, **values)
+    return _build_url(endpoint, tuple(sorted(values.items())))
+
+def clear_url_cache():
+    """Clear the memoized URLs (e.g. if the served host changes)"""
+    _build_url.cache_clear()